@@ -11,24 +11,45 @@ function onTrackStarted(track: MediaStreamTrack, participant?: Participant) {
   audioElement.play();
 }
 
+type DebugRecord = {
+  frame: string,
+  details: any,
+  dir?: string,
+}
+
 type DebugFrameMessage = {
   type: "debug-frame",
+  payload: DebugRecord
+}
+
+type DebugBatchMessage = {
+  type: "debug-batch",
   payload: {
-    frame: string,
-    details: any,
+    records: DebugRecord[],
+    dropped: number,
   }
 }
 
 type ServerMessage =
   | DebugFrameMessage
+  | DebugBatchMessage
+
+function onDebugRecord(record: DebugRecord) {
+  if (record.details) {
+    console.log(`${record.frame} > ${record.details}`)
+  } else {
+    console.log(record.frame)
+  }
+}
 
 function onServerMessage(message: ServerMessage) {
   if (message.type === "debug-frame") {
-    if (message.payload.details) {
-      console.log(`${message.payload.frame} > ${message.payload.details}`)
-    } else {
-      console.log(message.payload.frame)
+    onDebugRecord(message.payload)
+  } else if (message.type === "debug-batch") {
+    if (message.payload.dropped > 0) {
+      console.warn(`${message.payload.dropped} debug records dropped`)
     }
+    message.payload.records.forEach(onDebugRecord)
   } else {
     console.log("unknown message", message)
   }
@@ -44,6 +65,23 @@ const pcc = new PipecatClient({
   },
 });
 
+// a stable id for this browser, so the server can resume the game where it was left
+function sessionId(): string {
+  let id = localStorage.getItem("pcc-session")
+  if (!id) {
+    id = crypto.randomUUID()
+    localStorage.setItem("pcc-session", id)
+  }
+  return id
+}
+
 await pcc.connect({
-  connectionUrl: "/api/offer"
+  connectionUrl: "/api/offer",
+  requestData: { session: sessionId() },
 })
+
+// ?debug=off|events|frames chooses how much the server traces to us
+const debugLevel = new URLSearchParams(window.location.search).get("debug")
+if (debugLevel) {
+  pcc.sendClientMessage("debug-level", { level: debugLevel })
+}
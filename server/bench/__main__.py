@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.memory import footprint
+from bench.world import generate, play
+from engine.room import Room
+from engine.template import Template
+from engine.worldfile import WorldFile
+
+#------------------------------------------------------------------------------
+# benchmarks the engine hot paths against generated worlds, usage:
+#
+#   python -m bench [--profile large] [--output bench/results/HEAD.json]
+#   python -m bench compare bench/results/OLD.json bench/results/NEW.json
+#
+# results are written as json so that runs from different commits can be
+# compared, compare exits with a non-zero status if anything regressed by
+# more than --threshold
+#------------------------------------------------------------------------------
+
+PROFILES = {
+    "small": dict(items=100,   depth=3,   width=4),
+    "large": dict(items=10000, depth=4,   width=8),
+    "deep":  dict(items=2000,  depth=500, width=1, nesting=1.0, closed=0.0),
+    "wide":  dict(items=5000,  depth=1,   width=5000),
+}
+
+# metric -> True if a bigger number is better
+METRICS = {
+    "from_json_ms":       False,
+    "load_json_ms":       False,
+    "load_world_ms":      False,
+    "load_cached_us":     False,
+    "facts_cold_ms":      False,
+    "facts_warm_us":      False,
+    "facts_changed_us":   False,
+    "execute_per_sec":    True,
+    "memory_per_room_b":  False,
+}
+
+COMMANDS = 2000
+ROOMS    = 200
+
+#------------------------------------------------------------------------------
+
+def best(fn, repeat = 5, setup = None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def measure(profile, directory):
+    data = generate(seed=0, **PROFILES[profile])
+    source = os.path.join(directory, f"{profile}.json")
+    with open(source, "w") as file:
+        json.dump(data, file)
+    compiled = WorldFile.path(source)
+    clear = Template._cache.clear
+
+    results = {}
+    results["from_json_ms"] = best(lambda: Room.from_json(data)) * 1e3
+
+    results["load_json_ms"] = best(lambda: Room.load(source), setup=clear) * 1e3
+
+    Template.from_json(data).compile(compiled, source_mtime=os.stat(source).st_mtime_ns)
+    results["load_world_ms"] = best(lambda: Room.load(source), setup=clear) * 1e3
+    os.remove(compiled)
+
+    clear()
+    Room.load(source)
+    results["load_cached_us"] = best(lambda: Room.load(source), repeat=1000) * 1e6
+
+    fresh = {}
+    def setup():
+        fresh["room"] = Room.from_json(data)
+    results["facts_cold_ms"] = best(lambda: fresh["room"].facts(), setup=setup) * 1e3
+
+    room = Room.load(source)
+    room.facts()
+    results["facts_warm_us"] = best(room.facts, repeat=1000) * 1e6
+
+    rng = random.Random(0)
+    names = [name for name in room.template.names() if name != "room"]
+    def changed():
+        play(room, rng, names)
+        room.facts()
+    results["facts_changed_us"] = best(changed, repeat=200) * 1e6
+
+    room = Room.load(source)
+    rng = random.Random(0)
+    elapsed = best(lambda: [play(room, rng, names) for _ in range(COMMANDS)], repeat=1)
+    results["execute_per_sec"] = COMMANDS / elapsed
+
+    def session():
+        room = Room.load(source)
+        for _ in range(10):
+            play(room, rng, names)
+        room.facts()
+        return room
+    results["memory_per_room_b"] = footprint(session, ROOMS)
+
+    return results
+
+#------------------------------------------------------------------------------
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run(args):
+    profiles = args.profile or list(PROFILES)
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in profiles:
+            results = report["results"][profile] = measure(profile, directory)
+            print(profile)
+            for metric, value in results.items():
+                print(f"  {metric:<20} {value:>14,.1f}")
+
+    output = args.output or os.path.join("bench", "results", f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {output}")
+
+def compare(args):
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+
+    regressions = 0
+    print(f"{before['commit']} -> {after['commit']}")
+    for profile, results in after["results"].items():
+        for metric, value in results.items():
+            old = before["results"].get(profile, {}).get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if METRICS.get(metric) else change
+            flag = ""
+            if worse > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"  {profile:<6} {metric:<20} {old:>14,.1f} {value:>14,.1f} {change:>+8.1%}{flag}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    commands = parser.add_subparsers(dest="command")
+
+    parser.add_argument("--profile", action="append", choices=list(PROFILES))
+    parser.add_argument("--output")
+
+    comparing = commands.add_parser("compare")
+    comparing.add_argument("before")
+    comparing.add_argument("after")
+    comparing.add_argument("--threshold", type=float, default=0.25)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+    run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import random
+import time
+
+from bench.world import generate, play
+from engine import tokens
+from engine.room import Room
+from experience.context import ContextBudget
+
+#------------------------------------------------------------------------------
+# compares the prompt sent to the LLM over a long session when every turn is
+# kept versus when a ContextBudget trims (and summarizes) older turns, usage:
+#
+#   python -m bench.context [--turns 500] [--items 50] [--budget 1500] [--seed 0]
+#------------------------------------------------------------------------------
+
+SENTENCE = "the old narrator describes the dusty room and everything the player can see in it".split()
+
+def say(rng):
+    return " ".join(rng.choice(SENTENCE) for _ in range(rng.randint(5, 30)))
+
+async def session(args):
+    rng  = random.Random(args.seed)
+    room = Room.from_json(generate(items=args.items, seed=args.seed))
+
+    def world(max_tokens = None):
+        return "\n".join(room.stream(max_tokens=max_tokens))
+
+    budget   = ContextBudget(world, budget=args.budget)
+    kept     = [{"role": "system", "content": "You are the narrator."}, {"role": "system", "content": world(budget.share())}]
+    trimmed  = list(kept)
+    checkpoint = room.checkpoint()
+    fitting  = []
+
+    print(f"{'turn':>6} {'kept':>10} {'trimmed':>10}")
+    for t in range(1, args.turns + 1):
+        play(room, rng)
+        added, removed = room.diff(checkpoint).unwrap()
+        checkpoint = room.checkpoint()
+        turn = [
+            {"role": "system", "content": "\n".join(added + removed)},
+            {"role": "user", "content": say(rng)},
+        ]
+        kept    += turn
+        trimmed += turn
+
+        start = time.perf_counter()
+        fitted = budget.fit(trimmed)
+        fitting.append(time.perf_counter() - start)
+        if fitted is not None:
+            trimmed = fitted
+        budget.summarizing()
+        await asyncio.sleep(0)
+
+        if t == 1 or t % max(1, args.turns // 10) == 0:
+            print(f"{t:>6} {tokens.total(m['content'] for m in kept):>10,} {budget.size(trimmed):>10,}")
+
+        reply = {"role": "assistant", "content": say(rng)}
+        kept.append(reply)
+        trimmed.append(reply)
+
+    fitting.sort()
+    print(f"fit: median {fitting[len(fitting) // 2] * 1e6:.1f}µs, worst {fitting[-1] * 1e6:.1f}µs, {budget.trimmed} turns trimmed")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.context")
+    parser.add_argument("--turns",  type=int, default=500)
+    parser.add_argument("--items",  type=int, default=50)
+    parser.add_argument("--budget", type=int, default=ContextBudget.BUDGET)
+    parser.add_argument("--seed",   type=int, default=0)
+    asyncio.run(session(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
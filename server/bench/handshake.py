@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+
+import aiohttp
+
+from aiohttp import web
+from experience.http import HTTPPool
+
+#------------------------------------------------------------------------------
+# measures what a shared HTTPPool saves per turn against a local stand-in for
+# the smart turn endpoint, compared with opening a new ClientSession (and so
+# a new connection) for every session, usage:
+#
+#   python -m bench.handshake [--turns 500] [--tls]
+#
+# --tls serves https with a throwaway self-signed certificate (needs openssl)
+# which is where most of a real handshake goes
+#------------------------------------------------------------------------------
+
+async def predict(request):
+    await request.read()
+    return web.json_response({"prediction": 1, "probability": 0.9})
+
+def certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key  = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+        check=True, capture_output=True,
+    )
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(cert, key)
+    client = ssl.create_default_context(cafile=cert)
+    return server, client
+
+async def turn(session, url, client):
+    start = time.perf_counter()
+    async with session.post(url, data=b"\0" * 1024, ssl=client) as response:
+        await response.read()
+    return time.perf_counter() - start
+
+async def run(turns, tls):
+    with tempfile.TemporaryDirectory() as directory:
+        server_ssl, client_ssl = certificate(directory) if tls else (None, None)
+        app = web.Application()
+        app.router.add_post("/predict", predict)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_ssl)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = f"{'https' if tls else 'http'}://localhost:{port}/predict"
+
+        fresh = []
+        for _ in range(turns):
+            async with aiohttp.ClientSession() as session:
+                fresh.append(await turn(session, url, client_ssl))
+
+        pool = HTTPPool()
+        pooled = [await turn(pool.session(), url, client_ssl) for _ in range(turns)]
+        await pool.close()
+        await runner.cleanup()
+    return fresh, pooled
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.handshake")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    fresh, pooled = asyncio.run(run(args.turns, args.tls))
+    fresh_us  = sum(fresh)  / len(fresh)  * 1e6
+    pooled_us = sum(pooled) / len(pooled) * 1e6
+    print(f"{args.turns} turns over {'https' if args.tls else 'http'}")
+    print(f"  new session  {fresh_us:>10.1f}us/turn")
+    print(f"  pooled       {pooled_us:>10.1f}us/turn")
+    print(f"  saved        {fresh_us - pooled_us:>10.1f}us/turn")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import random
+import re
+import time
+
+from experience.intents import Intents
+
+#------------------------------------------------------------------------------
+# compares matching transcripts against hundreds of intents with one substring
+# check per phrase, one regex alternation, and the compiled Intents trie, usage:
+#
+#   python -m bench.intents [--intents 500] [--transcripts 2000] [--seed 0]
+#------------------------------------------------------------------------------
+
+VOCABULARY = [
+    "open", "close", "take", "drop", "look", "switch", "voice", "debug", "stop", "start",
+    "red", "blue", "green", "gold", "old", "small", "large", "dusty", "wooden", "silver",
+    "box", "chest", "key", "door", "drawer", "letter", "rug", "lamp", "book", "table",
+    "man", "woman", "please", "now", "the", "a", "to", "with", "on", "off",
+]
+
+def phrases(rng, count):
+    seen = set()
+    while len(seen) < count:
+        seen.add(" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 3))))
+    return list(seen)
+
+def best(fn, repeat = 5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.intents")
+    parser.add_argument("--intents", type=int, default=500)
+    parser.add_argument("--transcripts", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    table = phrases(rng, args.intents)
+    transcripts = [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(5, 20))) for _ in range(args.transcripts)]
+
+    intents = Intents()
+    for phrase in table:
+        intents.register(phrase, [phrase], None)
+    start = time.perf_counter()
+    intents.compile()
+    compiled = time.perf_counter() - start
+
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in sorted(table, key=len, reverse=True)) + r")\b")
+
+    substring = best(lambda: [[p for p in table if p in t.lower()] for t in transcripts])
+    regex     = best(lambda: [pattern.findall(t.lower()) for t in transcripts])
+    trie      = best(lambda: [intents.match(t) for t in transcripts])
+
+    print(f"{args.intents} intents, {args.transcripts} transcripts, compiled in {compiled * 1e3:.1f}ms")
+    for label, elapsed in [("substring", substring), ("regex", regex), ("intents", trie)]:
+        print(f"  {label:<10} {elapsed / len(transcripts) * 1e6:>8.1f}us/transcript")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import gc
+import tracemalloc
+
+from engine.event import Event
+from engine.room import Room
+
+#------------------------------------------------------------------------------
+# measures the steady-state footprint of a loaded room, usage:
+#
+#   python -m bench.memory [--rooms 1000] [--world data/room1.json]
+#
+#------------------------------------------------------------------------------
+
+def footprint(build, count):
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    live = [build() for _ in range(count)]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(live)
+
+def loaded(world):
+    room = Room.load(world)
+    room.facts()
+    return room
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--world", default="data/room1.json")
+    parser.add_argument("--rooms", type=int, default=1000)
+    args = parser.parse_args()
+
+    per_room  = footprint(lambda: loaded(args.world), args.rooms)
+    per_event = footprint(lambda: Event.Opened(target="drawer"), args.rooms)
+    print(f"{args.world}: {args.rooms} rooms, {per_room:,.0f} bytes per room")
+    print(f"{args.rooms} events, {per_event:,.0f} bytes per event")
+
+if __name__ == "__main__":
+    main()
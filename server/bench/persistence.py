@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from bench.world import play
+from engine.game import Game
+from engine.journal import Journal
+from engine.store import Store
+
+#------------------------------------------------------------------------------
+# measures what persisting to a Store costs each turn when hundreds of
+# sessions share one event loop, usage:
+#
+#   python -m bench.persistence [--sessions 500] [--turns 50] [--every 20]
+#
+# every session is a task that plays one random command per turn, with and
+# without a store attached, and the slowest turn is reported as well as the
+# average since that is what the voice pipeline would notice
+#------------------------------------------------------------------------------
+
+GAME = "data/example.json"
+
+async def session(game, rng, turns, timings):
+    for _ in range(turns):
+        start = time.perf_counter()
+        play(game.room, rng)
+        timings.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+
+async def sessions(count, turns, every, store):
+    games = []
+    for n in range(count):
+        game = Game.load(GAME)
+        game.room.journal = Journal(every)
+        if store is not None:
+            game.persist(store, f"session-{n}")
+        games.append(game)
+    timings = []
+    start = time.perf_counter()
+    await asyncio.gather(*[session(game, random.Random(n), turns, timings) for n, game in enumerate(games)])
+    return time.perf_counter() - start, timings
+
+def report(label, elapsed, timings):
+    average = sum(timings) / len(timings) * 1e6
+    slowest = max(timings) * 1e6
+    print(f"  {label:<10} {len(timings):>8,} turns in {elapsed:>6.2f}s {average:>8.1f}us/turn {slowest:>10.1f}us slowest")
+    return average
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.persistence")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--every", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.turns} turns, snapshot every {args.every} events")
+    baseline = report("memory", *asyncio.run(sessions(args.sessions, args.turns, args.every, None)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = Store(os.path.join(directory, "sessions.db"))
+        persisted = report("sqlite", *asyncio.run(sessions(args.sessions, args.turns, args.every, store)))
+        start = time.perf_counter()
+        store.flush()
+        drained = time.perf_counter() - start
+        store.close()
+        print(f"  overhead   {persisted - baseline:>+8.1f}us/turn")
+        print(f"  writer     {store.writes:,} writes in {store.commits:,} commits, {drained * 1e3:.1f}ms to drain")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import random
+
+from bench.world import generate, play
+from engine import tokens
+from engine.room import Room
+
+#------------------------------------------------------------------------------
+# compares the world-state tokens sent to the LLM over a long session when
+# every turn resends Room.facts() versus only sending Room.diff(), usage:
+#
+#   python -m bench.prompt_tokens [--turns 200] [--items 200] [--seed 0]
+#------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--seed",  type=int, default=0)
+    args = parser.parse_args()
+
+    rng  = random.Random(args.seed)
+    room = Room.from_json(generate(items=args.items, seed=args.seed))
+
+    checkpoint = room.checkpoint()
+    full_prompt = diff_prompt = tokens.total(room.facts())
+
+    print(f"{'turn':>6} {'full/turn':>10} {'diff/turn':>10} {'full prompt':>12} {'diff prompt':>12}")
+    for t in range(1, args.turns + 1):
+        play(room, rng)
+        added, removed = room.diff(checkpoint).unwrap()
+        checkpoint = room.checkpoint()
+
+        full = tokens.total(room.facts())
+        diff = tokens.total(added) + tokens.total(removed)
+        full_prompt += full
+        diff_prompt += diff
+
+        if t == 1 or t % max(1, args.turns // 10) == 0:
+            print(f"{t:>6} {full:>10,} {diff:>10,} {full_prompt:>12,} {diff_prompt:>12,}")
+
+if __name__ == "__main__":
+    main()
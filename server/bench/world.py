@@ -0,0 +1,89 @@
+import random
+
+from engine.command import Command
+
+#------------------------------------------------------------------------------
+# seeded generator for synthetic worlds, in the same json format as data/*.json
+#
+#   items     how many items to generate
+#   depth     how deep items can be nested below the room
+#   width     the most children any one item can have
+#   nesting   the chance that a non-leaf item is a container or supporter
+#   closed    the chance that a container starts closed
+#------------------------------------------------------------------------------
+
+ADJECTIVES = ["old", "dusty", "small", "heavy", "painted", "cracked", "plain", "golden"]
+CONTAINERS = ["box", "chest", "drawer", "cabinet", "crate", "bag"]
+SUPPORTERS = ["table", "shelf", "desk", "bench", "stool"]
+THINGS     = ["key", "coin", "book", "letter", "candle", "ring", "map", "cup"]
+
+def generate(items = 100, depth = 3, width = 4, nesting = 0.6, closed = 1.0, seed = 0):
+    rng = random.Random(seed)
+    data = {
+        "name": f"Generated Room {seed}",
+        "description": f"a generated room with {items} items",
+        "items": [],
+        "relationships": [],
+    }
+
+    pending = [("room", None, 0)]
+    count = 0
+    while count < items:
+        if pending:
+            parent, kind, level = pending.pop(0)
+        else:
+            parent, kind, level = "room", None, 0
+        for _ in range(rng.randint(1, width)):
+            if count == items:
+                break
+            name, traits = thing(rng, count, level + 1 >= depth, nesting, closed)
+            data["items"].append({
+                "name": name,
+                "description": f"a {rng.choice(ADJECTIVES)} {name.rstrip('0123456789')}",
+                "traits": traits,
+            })
+            data["relationships"].append({
+                "source": parent,
+                "relationship": "contains" if kind == "container" else "has",
+                "target": name,
+            })
+            if "container" in traits:
+                pending.append((name, "container", level + 1))
+            elif "supporter" in traits:
+                pending.append((name, "supporter", level + 1))
+            count += 1
+
+    return data
+
+def thing(rng, index, leaf, nesting, closed):
+    roll = rng.random()
+    if not leaf and roll < nesting * 2 / 3:
+        traits = ["container", "openable", "closable"]
+        if rng.random() < closed:
+            traits.append("closed")
+        return f"{rng.choice(CONTAINERS)}{index}", traits
+    elif not leaf and roll < nesting:
+        return f"{rng.choice(SUPPORTERS)}{index}", ["supporter"]
+    else:
+        return f"{rng.choice(THINGS)}{index}", ["takeable"]
+
+#------------------------------------------------------------------------------
+# picks and executes a random command that the player could actually issue
+#------------------------------------------------------------------------------
+
+def play(room, rng, names = None):
+    names = names or [name for name in room.template.names() if name != "room"]
+    while True:
+        name = rng.choice(names)
+        if not room.reachable(name):
+            continue
+        item = room.item(name)
+        if item.is_container:
+            command = Command.Close if item.is_open else Command.Open
+        elif item.is_takeable and not item.is_taken:
+            command = Command.Take
+        else:
+            continue
+        return room.execute(command(target=name))
+
+#------------------------------------------------------------------------------
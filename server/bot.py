@@ -1,60 +1,78 @@
+import asyncio
+import atexit
 import os
 import aiohttp
 import sys
 
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 from loguru import logger
 
-from pipecat.audio.vad.silero import SileroVADAnalyzer
+# only what every session needs is imported here, the transport, the services
+# and the VAD model pull in heavy dependencies (daily, onnxruntime, vendor
+# SDKs) and are imported where they are built, see python -m experience.imports
 from pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.audio.turn.smart_turn.fal_smart_turn import FalSmartTurnAnalyzer
-from pipecat.audio.turn.smart_turn.base_smart_turn import SmartTurnParams
 from pipecat.observers.base_observer import BaseObserver, FramePushed
-from pipecat.pipeline.pipeline import Pipeline, PipelineSink
+from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext, OpenAILLMContextFrame
-from pipecat.processors.frame_processor import Frame, FrameProcessor, FrameDirection
+from pipecat.processors.frame_processor import FrameProcessor
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor, RTVIServerMessageFrame
-from pipecat.runner.types import DailyRunnerArguments, RunnerArguments, SmallWebRTCRunnerArguments
+from pipecat.runner.types import RunnerArguments
 from pipecat.runner.utils import create_transport
-from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
-from pipecat.services.deepgram.stt import DeepgramSTTService
-from pipecat.services.openai.llm import OpenAILLMService
 from pipecat.transports.base_transport import BaseTransport, TransportParams
-from pipecat.transports.services.daily import DailyParams
 
+from pipecat.metrics.metrics import TTFBMetricsData
 from pipecat.frames.frames import (
     BotSpeakingFrame,
     BotStartedSpeakingFrame,
-    BotStoppedSpeakingFrame,
     InputAudioRawFrame,
+    InterimTranscriptionFrame,
     LLMFullResponseEndFrame,
     LLMFullResponseStartFrame,
     LLMMessagesAppendFrame,
-    LLMMessagesFrame,
-    LLMMessagesUpdateFrame,
     LLMRunFrame,
     LLMTextFrame,
     MetricsFrame,
     OutputTransportReadyFrame,
     SpeechControlParamsFrame,
-    StartFrame,
     StartInterruptionFrame,
-    StopInterruptionFrame,
     TTSAudioRawFrame,
+    TTSSpeakFrame,
     TTSStartedFrame,
-    TTSTextFrame,
+    TTSStoppedFrame,
     TTSUpdateSettingsFrame,
     TextFrame,
     TranscriptionFrame,
-    TranscriptionUpdateFrame,
     TransportMessageUrgentFrame,
-    UserStartedSpeakingFrame,
     UserStoppedSpeakingFrame,
 )
 
-from engine.game import Game
+if TYPE_CHECKING:
+    from experience.vad import SharedSileroVADAnalyzer
+    from pipecat.services.deepgram.stt import DeepgramSTTService
+    from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
+    from pipecat.services.openai.llm import OpenAILLMService
+
+from engine.command import Command
+from engine.game import Game, LiveRooms
+from engine.parser import Parser
+from engine.speculation import Speculator
+from engine.store import Store
+from experience import replies
+from experience.audio import Audio, AudioCache
+from experience.cache import ResponseCache
+from experience.context import ContextBudget
+from experience.debug import DebugChannel
+from experience.http import HTTPPool
+from experience.intents import Intents
+from experience.latency import TurnLatency
+from experience.metrics import REGISTRY, serve
+from experience.pool import WarmPool
+from experience.standin import StandinLLM
+from experience.tracing import Tracer
 
 load_dotenv(override=True)
 
@@ -75,127 +93,531 @@ NEVER_TRACE = (
     TransportMessageUrgentFrame,
 )
 
+TRACE_DETAILS = [
+    (OpenAILLMContextFrame, lambda frame: [f"{m["role"]}> {m["content"]}" for m in frame.context.messages]),
+    (TextFrame,             lambda frame: frame.text),
+]
+
+TRACE_EVERY = {frame: 0 for frame in NEVER_TRACE}  # frame class -> trace 1 in every N, 0 for never
+
+PROMPT_BUDGET = int(os.getenv("PCC_PROMPT_BUDGET", ContextBudget.BUDGET))
+WORLD_BUDGET  = int(PROMPT_BUDGET * ContextBudget.WORLD)  # tokens the description of the world may take
+
+def describe_world(facts):
+    return "\n".join(["The world currently looks like this:"] + [f"- {fact}" for fact in facts])
+
+def describe_room(room, max_tokens = WORLD_BUDGET):
+    # the room's facts, outermost first, up to [max_tokens] (see Room.stream)
+    return describe_world(room.stream(max_tokens=max_tokens))
+
+def describe_changes(added, removed):
+    lines = ["The world has changed."]
+    if removed:
+        lines += ["These facts are no longer true:"] + [f"- {fact}" for fact in removed]
+    if added:
+        lines += ["These facts are now true:"] + [f"- {fact}" for fact in added]
+    return "\n".join(lines)
+
+LATENCY_STAGES = {
+    UserStoppedSpeakingFrame:  "user-stopped",
+    TranscriptionFrame:        "transcribed",
+    LLMFullResponseStartFrame: "llm-started",
+    TTSStartedFrame:           "tts-started",
+    BotStartedSpeakingFrame:   "bot-started",
+}
+
+TURN_LATENCY = REGISTRY.histogram("pcc_turn_stage_seconds", "Time taken by each stage of a conversational turn.", "stage")
+TTFB         = REGISTRY.histogram("pcc_ttfb_seconds", "Time to first byte reported by each pipecat service.", "processor")
+PROMPT       = REGISTRY.histogram("pcc_prompt_tokens", "Estimated tokens in each prompt, before and after trimming.", "stage",
+                                 buckets=(250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 16000))
+SPECULATION  = REGISTRY.counter("pcc_speculation_total", "Commands by whether they were committed from a speculation.", "result")
+RESPONSES    = REGISTRY.counter("pcc_response_cache_total", "Response cache lookups by result.", "result")
+
+RESPONSE_CACHE = ResponseCache(counter=RESPONSES)  # shared by every session in this process
+
 WOMAN="21m00Tcm4TlvDq8ikWAM" # Rachel
 MAN="2EiwWnXFnvU5JabPnv8n" # Clyde
 
+TTS_MODEL = os.getenv("ELEVENLABS_TTS_MODEL", "eleven_flash_v2_5")
+TTS_SAMPLE_RATE = 24000
+
 #==================================================================================================
 
 class ExperienceObserver(BaseObserver):
-    def __init__(self, rtvi):
+    def __init__(self, debug):
         super().__init__()
-        self.rtvi = rtvi
-        self.enabled = False
+        self.debug = debug
+        self.tracer = Tracer(TRACE_DETAILS, TRACE_EVERY)
 
     async def on_push_frame(self, data: FramePushed):
-        if not self.enabled:
+        if not self.debug.wants(DebugChannel.Level.FRAMES):
             return
         frame = data.frame
+        trace = self.tracer.sample(frame)
+        if trace is None:
+            return
         src  = data.source
         dst  = data.destination
         dir  = f"{src.__class__.__name__} -> {dst.__class__.__name__}"
-        if isinstance(frame, OpenAILLMContextFrame):
-            await self.trace(frame, dir, [f"{m["role"]}> {m["content"]}" for m in frame.context.messages])
-        elif isinstance(frame, TextFrame):
-            await self.trace(frame, dir, frame.text)
-        elif not isinstance(frame, NEVER_TRACE):
-            await self.trace(frame, dir)
+        await self.trace(frame, dir, trace.format(frame))
 
     async def trace(self, frame, dir, details = None):
-        if not self.enabled:
-            return
         name = frame.__class__.__name__
         if details is None:
             logger.info(f"{name} : {dir}")
         else:
             logger.info(f"{name} : {dir} : {details}")
 
-        await self.rtvi.push_frame(RTVIServerMessageFrame(
-            data={
-                "type": "debug-frame",
-                "payload": {
-                    "frame": name,
-                    "details": details,
-                    "dir": f"{dir}",
-                },
-            }
-        ))
+        self.debug.post(DebugChannel.Level.FRAMES, {
+            "frame": name,
+            "details": details,
+            "dir": dir,
+        })
+
+#==================================================================================================
+
+class LatencyObserver(BaseObserver):
+    def __init__(self):
+        super().__init__()
+        self.turns = TurnLatency(TURN_LATENCY)
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+        stage = LATENCY_STAGES.get(type(frame))
+        if stage is not None:
+            self.turns.mark(stage, id=frame.id)
+        elif type(frame) is MetricsFrame:
+            for metric in frame.data:
+                # only count it as it leaves the service that measured it, not at every hop
+                if isinstance(metric, TTFBMetricsData) and metric.processor == data.source.name:
+                    TTFB.observe(metric.processor, metric.value)
 
 #==================================================================================================
 
 class ExperienceProcessor(FrameProcessor):
-    def __init__(self, rtvi):
+    def __init__(self, game, debug):
         super().__init__()
-        self.rtvi = rtvi
+        self.game = game
+        self.debug = debug
+        self.room = game.room
+        self.checkpoint = self.room.checkpoint()
+        self.tracer = Tracer(TRACE_DETAILS, TRACE_EVERY)
+        self.intents = Intents()
+        self.intents.register("woman",     ["woman"],                          lambda: self.switch_voice(WOMAN))
+        self.intents.register("man",       ["man"],                            lambda: self.switch_voice(MAN))
+        self.intents.register("debug-on",  ["debug on", "start debugging"],    lambda: self.debug_level(DebugChannel.Level.FRAMES))
+        self.intents.register("debug-off", ["debug off", "stop debugging"],    lambda: self.debug_level(DebugChannel.Level.EVENTS))
 
     async def process_frame(self, frame, direction):
         await super().process_frame(frame, direction)
 
         if isinstance(frame, TranscriptionFrame):
-            if "woman" in frame.text.lower():
-                await self.trace(frame, "SWITCH TO WOMAN")
-                await self.push_frame(
-                    TTSUpdateSettingsFrame(settings={
-                      "voice": WOMAN
-                    })
-                )
-            elif "man" in frame.text.lower():
-                await self.trace(frame, "SWITCH TO MAN")
-                await self.push_frame(
-                    TTSUpdateSettingsFrame(settings={
-                      "voice": MAN
-                    })
-                )
-
-        elif isinstance(frame, OpenAILLMContextFrame):
-            await self.trace(frame, [f"{m["role"]}> {m["content"]}" for m in frame.context.messages])
-        elif isinstance(frame, LLMTextFrame):
-            await self.trace(frame, frame.text)
-        elif isinstance(frame, TextFrame):
-            await self.trace(frame, frame.text)
-        elif not isinstance(frame, NEVER_TRACE):
-            await self.trace(frame)
+            await self.sync_world()
+            for name, action in self.intents.actions(frame.text):
+                await self.trace(frame, f"INTENT {name}", DebugChannel.Level.EVENTS)
+                await action()
+
+        elif self.debug.wants(DebugChannel.Level.FRAMES):
+            # only sampled, formatted and logged if the client asked for frames
+            trace = self.tracer.sample(frame)
+            if trace is not None:
+                await self.trace(frame, trace.format(frame))
 
         await self.push_frame(frame, direction)
 
-    async def trace(self, frame, details = None):
+    async def switch_voice(self, voice):
+        await self.push_frame(TTSUpdateSettingsFrame(settings={
+            "voice": voice
+        }))
+
+    async def debug_level(self, level):
+        self.debug.level = level
+
+    async def sync_world(self):
+        # only tell the LLM what changed since it last saw the world, unless
+        # the player has moved to a different room
+        room = self.game.room
+        if room is not self.room:
+            self.room = room
+            content = describe_room(room)
+        else:
+            added, removed = room.diff(self.checkpoint).unwrap()
+            if not added and not removed:
+                return
+            content = describe_changes(added, removed)
+        self.checkpoint = room.checkpoint()
+        await self.push_frame(LLMMessagesAppendFrame(
+            messages=[{"role": "system", "content": content}],
+            run_llm=False,
+        ))
+
+    async def trace(self, frame, details = None, level = DebugChannel.Level.FRAMES):
         name = frame.__class__.__name__
         if details is None:
             logger.info(f"{name}")
         else:
             logger.info(f"{name}: {details}")
 
-        await self.rtvi.push_frame(RTVIServerMessageFrame(
-            data={
-                "type": "debug-frame",
-                "payload": {
-                    "frame": name,
-                    "details": details,
-                },
-            }
-        ))
+        self.debug.post(level, {
+            "frame": name,
+            "details": details,
+        })
 
 #==================================================================================================
 
-async def run_bot(transport: BaseTransport):
-    tune_logger()
-    logger.info("STARTING BOT")
+class CommandProcessor(FrameProcessor):
+    # executes simple commands ("open the drawer") in the engine and answers
+    # them directly, anything the parser is unsure about, or that the engine
+    # refuses, goes on to the LLM as usual. Commands in interim transcripts
+    # are run speculatively, and their reply's audio fetched, while turn
+    # detection waits to see if the user has finished
+    def __init__(self, game, audio, http):
+        super().__init__()
+        self.game = game
+        self.audio = audio
+        self.http = http
+        self.voice = WOMAN
+        self.parsers = {}     # room name -> Parser
+        self.speculator = Speculator()
+        self.prefetch = None  # (audio key, task) for the speculated reply
 
-    game = Game.load("data/example.json")
-    logger.warning(game)
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, InterimTranscriptionFrame):
+            self.speculate(frame.text)
+        elif isinstance(frame, TranscriptionFrame):
+            reply = self.execute(frame.text)
+            if reply is not None:
+                logger.info(f"FAST PATH: {frame.text} -> {reply}")
+                await self.push_frame(LLMMessagesAppendFrame(
+                    messages=[
+                        {"role": "user", "content": frame.text},
+                        {"role": "assistant", "content": reply},
+                    ],
+                    run_llm=False,
+                ))
+                await self.speak(reply)
+                return
+        elif isinstance(frame, TTSUpdateSettingsFrame) and "voice" in frame.settings:
+            self.voice = frame.settings["voice"]
+
+        await self.push_frame(frame, direction)
+
+    async def speak(self, text):
+        # replies are fixed lines, so most have been pre-rendered (see prewarm)
+        # and the speculated one may already have been fetched
+        key = AudioCache.key(text, self.voice, TTS_MODEL)
+        if self.prefetch is not None and self.prefetch[0] == key:
+            audio = await self.prefetch[1]
+        else:
+            audio = await asyncio.to_thread(self.audio.get, key)
+        self.prefetch = None
+        if audio is None:
+            await self.push_frame(TTSSpeakFrame(text))
+            return
+        await self.push_frame(TTSStartedFrame())
+        await self.push_frame(TTSAudioRawFrame(audio.pcm, audio.sample_rate, audio.channels))
+        await self.push_frame(TTSStoppedFrame())
+
+    def parse(self, text):
+        room = self.game.room
+        parser = self.parsers.get(room.name)
+        if parser is None:
+            parser = self.parsers[room.name] = Parser.build(room.template)
+            prewarm(self.http, [room.template])  # a room this session has not used yet
+        command = parser.parse(text)
+        if isinstance(command, Command.Unlock):  # the engine cannot unlock yet
+            return None
+        return command
+
+    def speculate(self, text):
+        speculated = self.speculator.current
+        result = self.speculator.speculate(self.game.room, self.parse(text))
+        if result is None or result.is_err() or self.speculator.current is speculated:
+            return
+        key = AudioCache.key(replies.describe_events(result.ok_value), self.voice, TTS_MODEL)
+        self.prefetch = (key, asyncio.create_task(asyncio.to_thread(self.audio.get, key)))
+
+    def execute(self, text):
+        command = self.parse(text)
+        if command is None:
+            self.speculator.discard()
+            return None
+        hits = self.speculator.hits
+        result = self.speculator.commit(self.game.room, command)
+        SPECULATION.inc("hit" if self.speculator.hits > hits else "miss")
+        if result.is_err():
+            return None
+        return replies.describe_events(result.ok_value)
+
+#==================================================================================================
+
+class ResponseCacheProcessor(FrameProcessor):
+    # sits in front of the LLM and answers utterances it has already answered
+    # in the same world state, the ResponseRecorder behind the LLM caches the
+    # answers to the rest
+    def __init__(self, game, cache):
+        super().__init__()
+        self.game = game
+        self.cache = cache
+        self.pending = []    # keys of the utterances the LLM has yet to answer
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, TranscriptionFrame):
+            key = ResponseCache.key(self.game.room.fingerprint(), frame.text)
+            response = None if key is None else self.cache.get(key)
+            if response is not None:
+                logger.info(f"CACHED RESPONSE: {frame.text} -> {response}")
+                await self.push_frame(LLMMessagesAppendFrame(
+                    messages=[{"role": "user", "content": frame.text}],
+                    run_llm=False,
+                ))
+                await self.push_frame(LLMFullResponseStartFrame())
+                await self.push_frame(LLMTextFrame(response))
+                await self.push_frame(LLMFullResponseEndFrame())
+                return
+            self.pending.append(key)
+
+        await self.push_frame(frame, direction)
+
+class ResponseRecorder(FrameProcessor):
+    def __init__(self, front):
+        super().__init__()
+        self.front = front
+        self.key = None
+        self.parts = None
 
-    stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"))
-    tts = ElevenLabsTTSService(
-        api_key=os.getenv("ELEVENLABS_API_KEY"),
-        model=os.getenv("ELEVENLABS_TTS_MODEL", "eleven_flash_v2_5"),
-        voice_id=WOMAN,
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMFullResponseStartFrame):
+            # an answer to several utterances at once is not worth caching
+            keys, self.front.pending = self.front.pending, []
+            self.key = keys[0] if len(keys) == 1 else None
+            self.parts = []
+        elif isinstance(frame, LLMTextFrame) and self.parts is not None:
+            self.parts.append(frame.text)
+        elif isinstance(frame, LLMFullResponseEndFrame) and self.parts is not None:
+            if self.key is not None:
+                self.front.cache.put(self.key, "".join(self.parts))
+            self.key = self.parts = None
+        elif isinstance(frame, StartInterruptionFrame):
+            self.key = self.parts = None
+
+        await self.push_frame(frame, direction)
+
+#==================================================================================================
+
+class ContextBudgetProcessor(FrameProcessor):
+    # sits between the user context aggregator and the LLM and keeps the
+    # prompt within a token budget, older turns are summarized in the background
+    def __init__(self, game, budget):
+        super().__init__()
+        self.budget = ContextBudget(lambda max_tokens: describe_room(game.room, max_tokens), budget=budget)
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OpenAILLMContextFrame):
+            context = frame.context
+            untrimmed = self.budget.size(context.messages)
+            fitted = self.budget.fit(context.messages)
+            if fitted is not None:
+                context.set_messages(fitted)
+            sent = self.budget.size(context.messages)
+            PROMPT.observe("untrimmed", untrimmed)
+            PROMPT.observe("sent", sent)
+            logger.info(f"PROMPT: {sent} tokens in {len(context.messages)} messages ({untrimmed} untrimmed, {self.budget.trimmed} turns trimmed so far)")
+            await self.push_frame(frame, direction)
+            self.budget.summarizing()
+            return
+
+        await self.push_frame(frame, direction)
+
+    async def cleanup(self):
+        await super().cleanup()
+        await self.budget.close()
+
+#==================================================================================================
+
+class StandinLLMService(FrameProcessor):
+    # answers with a StandinLLM instead of OpenAI, set PCC_LLM=standin
+    def __init__(self, llm = None):
+        super().__init__()
+        self.llm = llm or StandinLLM()
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OpenAILLMContextFrame):
+            await asyncio.sleep(self.llm.delay)
+            await self.push_frame(LLMFullResponseStartFrame())
+            await self.push_frame(LLMTextFrame(self.llm.reply(frame.context.messages)))
+            await self.push_frame(LLMFullResponseEndFrame())
+        else:
+            await self.push_frame(frame, direction)
+
+#==================================================================================================
+
+STORE = None
+
+def session_store():
+    global STORE
+    if STORE is None:
+        STORE = Store(os.getenv("PCC_STORE", "data/sessions.db"))
+        STORE.expire(float(os.getenv("PCC_STORE_DAYS", "30")) * 24 * 60 * 60)
+        atexit.register(STORE.close)  # so the writer commits its last batch
+    return STORE
+
+METRICS = None
+
+async def metrics_server():
+    # one endpoint per process, shared by all of its sessions
+    global METRICS
+    if METRICS is None:
+        port = int(os.getenv("PCC_METRICS_PORT", "9464")) + int(os.getenv("PCC_WORKER", "0"))
+        try:
+            METRICS = await serve(REGISTRY, port=port)
+            logger.info(f"METRICS ON http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            METRICS = False
+            logger.warning(f"METRICS DISABLED: {e}")
+    return METRICS
+
+AUDIO = None
+
+def audio_cache():
+    global AUDIO
+    if AUDIO is None:
+        AUDIO = AudioCache(os.getenv("PCC_AUDIO_CACHE", "data/audio"))
+    return AUDIO
+
+async def synthesize(http, text, voice):
+    async with http.post(
+        f"https://api.elevenlabs.io/v1/text-to-speech/{voice}",
+        params={"output_format": f"pcm_{TTS_SAMPLE_RATE}"},
+        headers={"xi-api-key": os.getenv("ELEVENLABS_API_KEY")},
+        json={"text": text, "model_id": TTS_MODEL},
+    ) as response:
+        response.raise_for_status()
+        return Audio(await response.read(), TTS_SAMPLE_RATE, 1)
+
+PREWARMED = set()   # templates whose replies this process has rendered, or is rendering
+PREWARMING = set()  # the background tasks rendering them
+
+def prewarm(http, templates):
+    # renders the fixed replies of [templates], in both voices, once per
+    # process and in the background, unless an earlier process already has.
+    # Only rooms that are already loaded are passed in, so nothing is parsed
+    # just to warm it
+    fresh = [template for template in templates if not template in PREWARMED]
+    if fresh:
+        PREWARMED.update(fresh)
+        task = asyncio.create_task(render(http, fresh))
+        PREWARMING.add(task)
+        task.add_done_callback(PREWARMING.discard)
+
+async def render(http, templates):
+    cache = audio_cache()
+    rendered = 0
+    for i, template in enumerate(templates):
+        for text in replies.lines(template):
+            for voice in (WOMAN, MAN):
+                key = AudioCache.key(text, voice, TTS_MODEL)
+                if await asyncio.to_thread(cache.contains, key):
+                    continue
+                try:
+                    audio = await synthesize(http, text, voice)
+                    await asyncio.to_thread(cache.put, key, audio)
+                except Exception as e:
+                    logger.warning(f"PREWARM FAILED: {e!r}")
+                    PREWARMED.difference_update(templates[i:])  # a later session can try again
+                    return
+                rendered += 1
+    logger.info(f"PREWARMED {rendered} LINES")
+
+VAD_PARAMS = VADParams(
+    confidence=0.7,
+    start_secs=0.2,
+    stop_secs=2,
+    min_volume=0.6,
+)
+
+GAME = "data/example.json"
+LIVE_ROOMS = LiveRooms(int(os.getenv("PCC_LIVE_ROOMS", "64")))  # shared by every session in this process
+
+@dataclass
+class Services:
+    vad: "SharedSileroVADAnalyzer"
+    stt: "DeepgramSTTService"
+    tts: "ElevenLabsTTSService"
+    llm: "OpenAILLMService"
+    game: Game
+
+def build_services():
+    from experience.vad import SharedSileroVADAnalyzer
+    from pipecat.services.deepgram.stt import DeepgramSTTService
+    from pipecat.services.elevenlabs.tts import ElevenLabsTTSService
+    from pipecat.services.openai.llm import OpenAILLMService
+
+    game = Game.load(GAME, live=LIVE_ROOMS)
+    game.room  # loads (and caches) the starting room's template
+    return Services(
+        vad=SharedSileroVADAnalyzer(params=VAD_PARAMS),
+        stt=DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY")),
+        tts=ElevenLabsTTSService(
+            api_key=os.getenv("ELEVENLABS_API_KEY"),
+            model=TTS_MODEL,
+            voice_id=WOMAN,
+        ),
+        llm=OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY", "standin")),  # the stand-in still uses its context aggregators
+        game=game,
     )
-    llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"))
+
+HTTP = HTTPPool(
+    limit_per_host=int(os.getenv("PCC_HTTP_LIMIT_PER_HOST", HTTPPool.LIMIT_PER_HOST)),
+    keepalive=float(os.getenv("PCC_HTTP_KEEPALIVE", HTTPPool.KEEPALIVE)),
+    registry=REGISTRY,
+)  # shared by every session in this process, see bot()
+
+SERVICES = WarmPool(build_services, size=int(os.getenv("PCC_WARM_POOL", WarmPool.SIZE)))
+
+def session_id(runner_args: RunnerArguments):
+    # the client's stable id (see client/src/main.ts), or None if it sent none,
+    # in which case there is nothing to resume later and the session is not stored
+    body = getattr(runner_args, "body", None) or {}
+    return body.get("session")
+
+#==================================================================================================
+
+async def run_bot(transport: BaseTransport, session: str, http: aiohttp.ClientSession, services: Services):
+    tune_logger()
+    logger.info(f"STARTING BOT (session {session})")
+    await metrics_server()
+
+    game = services.game
+    store = None
+    if session is not None:
+        store = session_store()
+        await asyncio.to_thread(game.persist, store, session)  # resuming reads from disk
+    logger.warning(game)
+
+    stt = services.stt
+    tts = services.tts
+    llm = services.llm
 
     messages = [
         {
             "role": "system",
             "content": "You are an AI assistant. Respond naturally and keep your answers conversational, but brief.",
         },
+        {
+            "role": "system",
+            "content": describe_room(game.room),
+        },
         {
             "role": "system",
             "content": "Say hello and briefly introduce yourself."
@@ -204,8 +626,27 @@ async def run_bot(transport: BaseTransport):
 
     context = OpenAILLMContext(messages)
     context_aggregator = llm.create_context_aggregator(context)
+    if os.getenv("PCC_LLM") == "standin":
+        llm = StandinLLMService()
     rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
-    experience = ExperienceProcessor(rtvi)
+
+    async def send_debug(records, dropped):
+        await rtvi.push_frame(RTVIServerMessageFrame(
+            data={
+                "type": "debug-batch",
+                "payload": {
+                    "records": records,
+                    "dropped": dropped,
+                },
+            }
+        ))
+
+    debug = DebugChannel(send_debug)
+    observer = ExperienceObserver(debug)
+    experience = ExperienceProcessor(game, debug)
+    commands = CommandProcessor(game, audio_cache(), http)
+    responses = ResponseCacheProcessor(game, RESPONSE_CACHE)
+    budget = ContextBudgetProcessor(game, PROMPT_BUDGET)
 
     pipeline = Pipeline(
         [
@@ -213,8 +654,12 @@ async def run_bot(transport: BaseTransport):
             rtvi,  # RTVI processor
             stt,
             experience, # OUR EXPERIENCE
+            commands,  # Commands the engine can answer without the LLM
+            responses,  # Answers the LLM has already given in this world state
             context_aggregator.user(),  # User responses
+            budget,  # Keeps the prompt within its token budget
             llm,  # LLM
+            ResponseRecorder(responses),  # Remembers them
             tts,  # TTS
             transport.output(),  # Transport bot output
             context_aggregator.assistant(),  # Assistant spoken responses
@@ -230,73 +675,104 @@ async def run_bot(transport: BaseTransport):
         ),
         observers=[
             RTVIObserver(rtvi),
-            ExperienceObserver(rtvi),
+            observer,
+            LatencyObserver(),
         ],
     )
 
+    @rtvi.event_handler("on_client_message")
+    async def on_client_message(rtvi, message):
+        if message.type == "debug-level":
+            try:
+                debug.level = DebugChannel.Level.parse(message.data.get("level", "events"))
+            except KeyError:
+                logger.warning(f"unknown debug level {message.data}")
+
     @transport.event_handler("on_client_connected")
     async def on_client_connected(transport, client):
         logger.info("CLIENT CONNECTED")
+        debug.start()
         await task.queue_frames([LLMRunFrame()])
 
     @transport.event_handler("on_client_disconnected")
     async def on_client_disconnected(transport, client):
         logger.info("CLIENT DISCONNECTED")
+        await debug.stop()
         await task.cancel()
+        if store is not None:
+            store.locate(session, game.location)  # so an active session does not expire
+            await asyncio.to_thread(store.flush)
 
     runner = PipelineRunner(handle_sigint=False)
 
-    await runner.run(task)
+    prewarm(http, [room.template for room in game.live.values()])
+    try:
+        await runner.run(task)
+    finally:
+        game.close()
 
 #==================================================================================================
 
 async def bot(runner_args: RunnerArguments):
+    from pipecat.audio.turn.smart_turn.base_smart_turn import SmartTurnParams
+    from pipecat.audio.turn.smart_turn.fal_smart_turn import FalSmartTurnAnalyzer
+
+    http = HTTP.session()
+
+    services = await SERVICES.acquire()
+    logger.info(f"WARM POOL: {SERVICES.hits} hits, {SERVICES.misses} misses")
+    vad_analyzer = services.vad
+
+    smart_turn_analyzer = FalSmartTurnAnalyzer(
+        api_key = os.getenv("FAL_API_KEY"),
+        aiohttp_session=http,
+        params=SmartTurnParams(
+            stop_secs=3.0,
+            pre_speech_ms=0.0,
+            max_duration_secs=8.0,
+        ),
+    )
 
-    async with aiohttp.ClientSession() as session:
-
-        vad_analyzer = SileroVADAnalyzer(
-            params=VADParams(
-                confidence=0.7,
-                start_secs=0.2,
-                stop_secs=2,
-                min_volume=0.6,
-            ),
+    def daily_params():
+        from pipecat.transports.services.daily import DailyParams
+        return DailyParams(
+            audio_in_enabled=True,
+            audio_out_enabled=True,
+            vad_analyzer=vad_analyzer,
+            smart_turn_analyzer=smart_turn_analyzer,
         )
 
-        smart_turn_analyzer = FalSmartTurnAnalyzer(
-            api_key = os.getenv("FAL_API_KEY"),
-            aiohttp_session=session,
-            params=SmartTurnParams(
-                stop_secs=3.0,
-                pre_speech_ms=0.0,
-                max_duration_secs=8.0,
-            ),
-        )
+    transport_params = {
+        # DEVELOPMENT
+        "webrtc": lambda: TransportParams(
+            audio_in_enabled=True,
+            audio_out_enabled=True,
+            vad_analyzer=vad_analyzer,
+            smart_turn_analyzer=smart_turn_analyzer,
+        ),
 
-        transport_params = {
-            # DEVELOPMENT
-            "webrtc": lambda: TransportParams(
-                audio_in_enabled=True,
-                audio_out_enabled=True,
-                vad_analyzer=vad_analyzer,
-                smart_turn_analyzer=smart_turn_analyzer,
-            ),
+        # PRODUCTION
+        "daily": daily_params,
+    }
 
-            # PRODUCTION
-            "daily": lambda: DailyParams(
-                audio_in_enabled=True,
-                audio_out_enabled=True,
-                vad_analyzer=vad_analyzer,
-                smart_turn_analyzer=smart_turn_analyzer,
-            ),
-        }
+    transport = await create_transport(runner_args, transport_params)
 
-        transport = await create_transport(runner_args, transport_params)
+    await run_bot(transport, session_id(runner_args), http, services)
 
-        await run_bot(transport)
+async def supervised(payload):
+    # a Daily session started by python -m experience.supervisor bot:supervised,
+    # which spreads sessions across a worker process per core, the payload is
+    # {"room_url": ..., "token": ..., "body": {...}}
+    from pipecat.runner.types import DailyRunnerArguments
+    await bot(DailyRunnerArguments(
+        room_url=payload["room_url"],
+        token=payload.get("token"),
+        body=payload.get("body") or {},
+    ))
 
 #==================================================================================================
 
 if __name__ == "__main__":
     from pipecat.runner.run import main
+    SERVICES.prefill()  # so that even the first client connects to a warm pool
     main()
@@ -1,30 +1,25 @@
-from enum import Enum
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Command:
     pass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OpenCommand(Command):
-    def __init__(self, target):
-        self.target = target
+    target: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CloseCommand(Command):
-    def __init__(self, target):
-        self.target = target
+    target: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnlockCommand(Command):
-    def __init__(self, target, using):
-        self.target = target
-        self.using  = using
+    target: str
+    using: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TakeCommand(Command):
-    def __init__(self, target):
-        self.target = target
+    target: str
 
 Command.Open   = OpenCommand
 Command.Close  = CloseCommand
@@ -0,0 +1,24 @@
+import json
+import os
+import sys
+
+from .template import Template
+from .worldfile import WorldFile
+
+#------------------------------------------------------------------------------
+# compiles json world files into memory-mappable .world files, usage:
+#
+#   python -m engine.compile data/*.json
+#
+#------------------------------------------------------------------------------
+
+def main(filenames):
+    for filename in filenames:
+        mtime = os.stat(filename).st_mtime_ns
+        with open(filename) as file:
+            template = Template.from_json(json.load(file))
+        target = template.compile(WorldFile.path(filename), source_mtime=mtime)
+        print(f"{filename} -> {target} ({os.path.getsize(target):,} bytes)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
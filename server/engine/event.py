@@ -1,30 +1,25 @@
-from enum import Enum
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Event:
     pass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OpenedEvent(Event):
-    def __init__(self, target):
-        self.target = target
+    target: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ClosedEvent(Event):
-    def __init__(self, target):
-        self.target = target
+    target: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnlockedEvent(Event):
-    def __init__(self, target, using):
-        self.target = target
-        self.using = using
+    target: str
+    using: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TakenEvent(Event):
-    def __init__(self, target):
-        self.target = target
+    target: str
 
 Event.Opened   = OpenedEvent
 Event.Closed   = ClosedEvent
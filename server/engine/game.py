@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+
+from collections import OrderedDict
+from result import Ok, Err
+
+from .journal import Journal
+from .room import Room
+from .template import Template
+
+#------------------------------------------------------------------------------
+# LiveRooms bounds how many rooms are kept live at once. The least recently
+# used rooms are evicted to their compact journal (see Journal.dump), in the
+# Game they belong to, and resumed when the player returns. One LiveRooms can
+# be shared by every Game (every session) in a process, so that the bound is
+# per process rather than per session. A game's current room is never
+# evicted, since its session may be using it, and nor is a room as it is
+# put, so the bound can be exceeded while every other room is current.
+#------------------------------------------------------------------------------
+
+class LiveRooms:
+
+    def __init__(self, capacity):
+        assert capacity > 0
+        self.capacity = capacity
+        self.rooms = OrderedDict()    # (game, room name) -> Room, least recently used first
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def get(self, game, name):
+        with self.lock:
+            room = self.rooms.get((game, name))
+            if room is not None:
+                self.rooms.move_to_end((game, name))
+            return room
+
+    def put(self, game, name, room):
+        with self.lock:
+            self.rooms[(game, name)] = room
+            if len(self.rooms) > self.capacity:
+                # neither a current room nor the one just asked for, which may not be current
+                for key in [key for key in self.rooms if key[0].location != key[1] and key != (game, name)]:
+                    cold_game, cold = key
+                    cold_game.evicted[cold] = self.rooms.pop(key).journal.dump()
+                    if len(self.rooms) <= self.capacity:
+                        break
+
+    def pop(self, game, name):
+        with self.lock:
+            return self.rooms.pop((game, name), None)
+
+    def of(self, game):
+        # [game]'s live rooms, least recently used first
+        with self.lock:
+            return OrderedDict((name, room) for (owner, name), room in self.rooms.items() if owner is game)
+
+    def release(self, game):
+        with self.lock:
+            for key in [key for key in self.rooms if key[0] is game]:
+                del self.rooms[key]
+
+#------------------------------------------------------------------------------
+# A Game is an index of rooms and the exits between them. Rooms are only
+# loaded when the player first enters them, and kept live in [live] (a
+# LiveRooms of its own with [capacity], unless a shared one is given).
+#
+# A game can also be persisted to a Store, which is then sent every event and
+# move of the session as it happens.
+#------------------------------------------------------------------------------
+
+class Game:
+
+    CAPACITY = 8
+
+    def __init__(self, name, start, rooms, exits, capacity = CAPACITY, live = None):
+        assert start in rooms
+        self.name = name
+        self.start = start
+        self.rooms = rooms          # room name -> world filename
+        self.exits = exits          # room name -> { direction -> room name }
+        self.location = start
+        self.shared = LiveRooms(capacity) if live is None else live
+        self.evicted = {}           # room name -> Journal.dump()
+        self.store = None
+        self.session = None
+
+    def __repr__(self):
+        return f"Game({self.name!r}, rooms={len(self.rooms)}, live={len(self.live)}, location={self.location!r})"
+
+    @property
+    def live(self):
+        return self.shared.of(self)
+
+    def close(self):
+        # the session is over, its rooms no longer count against the bound
+        self.shared.release(self)
+
+    #--------------------------------------------------------------------------
+
+    @property
+    def room(self):
+        return self.get(self.location)
+
+    def get(self, name):
+        room = self.shared.get(self, name)
+        if room is not None:
+            return room
+
+        template = Template.load(self.rooms[name])
+        data = self.evicted.pop(name, None)
+        if data is None:
+            room = Room(template)
+        else:
+            room = Room.resume(template, Journal.load(data))
+        if self.store is not None:
+            room.journal.sink = self.store.sink(self.session, name)
+
+        self.shared.put(self, name, room)
+        return room
+
+    #--------------------------------------------------------------------------
+
+    def enter(self, name):
+        if not name in self.rooms:
+            return Err(f"[{name}] is not a room")
+        self.location = name
+        if self.store is not None:
+            self.store.locate(self.session, name)
+        return Ok(self.room)
+
+    def go(self, direction):
+        target = self.exits.get(self.location, {}).get(direction)
+        if target is None:
+            return Err(f"there is no exit {direction}")
+        return self.enter(target)
+
+    #--------------------------------------------------------------------------
+
+    def persist(self, store, session):
+        # resumes [session] if it was stored before, then stores it from now on
+        location = store.location(session)
+        if location in self.rooms:
+            self.location = location
+        for name, journal in store.journals(session).items():
+            if name in self.rooms:
+                self.shared.pop(self, name)
+                self.evicted[name] = journal.dump()
+        self.store = store
+        self.session = session
+        for name, room in self.live.items():
+            room.journal.sink = store.sink(session, name)
+        store.locate(session, self.location)
+        return self
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def load(filename, capacity = CAPACITY, live = None):
+        with open(filename) as file:
+            data = json.load(file)
+        return Game.from_json(data, os.path.dirname(filename), capacity, live)
+
+    @staticmethod
+    def from_json(data, directory = ".", capacity = CAPACITY, live = None):
+        name = data.get("name")
+        start = data.get("start")
+
+        assert name is not None
+        assert start is not None
+
+        rooms = {}
+        for r in data.get("rooms", []):
+            rooms[r.get("name")] = os.path.join(directory, r.get("world"))
+
+        exits = {}
+        for e in data.get("exits", []):
+            exits.setdefault(e.get("source"), {})[e.get("direction")] = e.get("target")
+
+        return Game(
+            name=name,
+            start=start,
+            rooms=rooms,
+            exits=exits,
+            capacity=capacity,
+            live=live,
+        )
+
+    #--------------------------------------------------------------------------
@@ -0,0 +1,179 @@
+import sys
+
+from array import array
+
+from .relationship import Relationship
+
+#------------------------------------------------------------------------------
+# A Graph is the read-only relationship structure of a Template. Every item
+# has an interned integer id, children are stored as CSR arrays (one offsets
+# and one targets array per Relationship.Kind) and every item records its
+# single parent, so that containment and parent lookups are O(1) and listing
+# children is O(degree). The arrays are either built from json or are views
+# straight into a memory-mapped .world file.
+#
+# A session never changes a Graph; it changes an Overlay instead.
+#------------------------------------------------------------------------------
+
+class Graph:
+
+    NONE  = 0xFFFFFFFF
+    KINDS = tuple(Relationship.Kind)
+
+    def __init__(self, names, index, adjacency, parents, kinds):
+        self.names = names            # id -> name
+        self.index = index            # name -> id
+        self.adjacency = adjacency    # kind -> (offsets, targets)
+        self.parents = parents        # id -> parent id, or NONE
+        self.kinds = kinds            # id -> KINDS index of the relationship to its parent
+
+    def __len__(self):
+        return len(self.names)
+
+    #--------------------------------------------------------------------------
+
+    def id(self, name):
+        return self.index.get(name)
+
+    def name(self, id):
+        return self.names[id]
+
+    def children(self, id, kind):
+        offsets, targets = self.adjacency[kind]
+        return targets[offsets[id]:offsets[id + 1]]
+
+    def parent(self, id):
+        parent = self.parents[id]
+        if parent == Graph.NONE:
+            return None
+        return parent, Graph.KINDS[self.kinds[id]]
+
+    def overlay(self):
+        return Overlay(self)
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def build(names, relationships):
+        names = [sys.intern(name) for name in names]
+        index = {name: id for id, name in enumerate(names)}
+        parents = array("I", [Graph.NONE]) * len(names)
+        kinds   = array("B", [0]) * len(names)
+        rows = [[[] for _ in names] for _ in Graph.KINDS]
+        for relationship in relationships:
+            source = index[relationship.source]
+            target = index[relationship.target]
+            kind = Graph.KINDS.index(relationship.kind)
+            if parents[target] == source and kinds[target] == kind:
+                continue
+            assert parents[target] == Graph.NONE, f"[{relationship.target}] cannot be in two places"
+            rows[kind][source].append(target)
+            parents[target] = source
+            kinds[target] = kind
+        return Graph(
+            names=names,
+            index=index,
+            adjacency={kind: Graph.csr(row) for kind, row in zip(Graph.KINDS, rows)},
+            parents=parents,
+            kinds=kinds,
+        )
+
+    @staticmethod
+    def csr(rows):
+        offsets = array("I", [0])
+        targets = array("I")
+        for row in rows:
+            targets.extend(row)
+            offsets.append(len(targets))
+        return offsets, targets
+
+#------------------------------------------------------------------------------
+# An Overlay is a session's copy-on-write view of a Graph, only the children
+# and parents of items that have moved are stored.
+#------------------------------------------------------------------------------
+
+class Overlay:
+    __slots__ = ("graph", "_children", "_parents")
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._children = {}    # (id, kind) -> [id]
+        self._parents = {}     # id -> (parent id, kind) or None
+
+    def id(self, name):
+        return self.graph.id(name)
+
+    def name(self, id):
+        return self.graph.name(id)
+
+    def children(self, id, kind):
+        children = self._children.get((id, kind))
+        if children is None:
+            return self.graph.children(id, kind)
+        return children
+
+    def parent(self, id):
+        if id in self._parents:
+            return self._parents[id]
+        return self.graph.parent(id)
+
+    def contains(self, parent, child):
+        found = self.parent(child)
+        return found is not None and found[0] == parent
+
+    #--------------------------------------------------------------------------
+
+    def detach(self, id):
+        found = self.parent(id)
+        if found is None:
+            return None
+        parent, kind = found
+        children = list(self.children(parent, kind))
+        children.remove(id)
+        self._children[(parent, kind)] = children
+        self._parents[id] = None
+        return parent
+
+    def attach(self, id, parent, kind):
+        self.detach(id)
+        children = list(self.children(parent, kind))
+        children.append(id)
+        self._children[(parent, kind)] = children
+        self._parents[id] = (parent, kind)
+
+    #--------------------------------------------------------------------------
+
+    def copy(self):
+        # children lists are only ever replaced, never mutated, so they can be shared
+        overlay = Overlay(self.graph)
+        overlay._children = dict(self._children)
+        overlay._parents = dict(self._parents)
+        return overlay
+
+    def dump(self):
+        # by name, since ids are only stable for one build of a graph, they
+        # differ between the json and the compiled form of the same world and
+        # move whenever the world is edited
+        name = self.graph.name
+        children = {(name(id), kind): [name(child) for child in ids] for (id, kind), ids in self._children.items()}
+        parents = {name(id): found and (name(found[0]), found[1]) for id, found in self._parents.items()}
+        return children, parents
+
+    def restore(self, data):
+        # names the graph no longer has are skipped
+        children, parents = data
+        id = self.graph.id
+        for (name, kind), names in children.items():
+            parent = id(name)
+            if parent is not None:
+                self._children[(parent, kind)] = [child for child in map(id, names) if child is not None]
+        for name, found in parents.items():
+            child = id(name)
+            if child is None:
+                continue
+            if found is None:
+                self._parents[child] = None
+            elif (parent := id(found[0])) is not None:
+                self._parents[child] = (parent, found[1])
+
+#------------------------------------------------------------------------------
@@ -1,50 +1,49 @@
-from enum import Enum
+from enum import IntFlag, auto
+from functools import reduce
+from operator import or_
 from result import Ok, Err
-from .relationship import Relationship
 from .event import Event
 
 class Item:
-    class Trait(Enum):
-        TAKEABLE   = "takeable"      # can be taken by the player (inventory)
-        OPENABLE   = "openable"      # can be opened
-        CLOSABLE   = "closable"      # can be closed
-        LOCKABLE   = "lockable"      # can be locked
-        UNLOCKABLE = "unlockable"    # can be unlocked
-        CONTAINER  = "container"     # holds items inside
-        SUPPORTER  = "supporter"     # items rest on top
-        READABLE   = "readable"      # has text to read
-        TAKEN      = "taken"         # IS taken (inventory)
-        CLOSED     = "closed"        # IS closed
-        LOCKED     = "locked"        # IS locked
+    class Trait(IntFlag):
+        TAKEABLE   = auto()    # can be taken by the player (inventory)
+        OPENABLE   = auto()    # can be opened
+        CLOSABLE   = auto()    # can be closed
+        LOCKABLE   = auto()    # can be locked
+        UNLOCKABLE = auto()    # can be unlocked
+        CONTAINER  = auto()    # holds items inside
+        SUPPORTER  = auto()    # items rest on top
+        READABLE   = auto()    # has text to read
+        TAKEN      = auto()    # IS taken (inventory)
+        CLOSED     = auto()    # IS closed
+        LOCKED     = auto()    # IS locked
+
+        @staticmethod
+        def parse(value):
+            return Item.Trait[value.upper()]
+
+    NONE      = Trait(0)
+    ENCLOSING = Trait.OPENABLE | Trait.CLOSABLE | Trait.CONTAINER
+    DOORLIKE  = Trait.OPENABLE | Trait.CLOSABLE
+
+    __slots__ = ("name", "description", "traits")
 
     def __init__(self, name, description = None, traits = None):
         self.name = name
         self.description = description
-        self.traits   = set(traits or [])
-        self.has      = []
-        self.contains = []
-        self.supports = []
+        self.traits = traits if isinstance(traits, Item.Trait) else reduce(or_, traits or [], Item.NONE)
+
+    def copy(self):
+        return Item(self.name, self.description, self.traits)
 
     def has_trait(self, trait):
-        return trait in self.traits
+        return (self.traits & trait) == trait
 
     def add_trait(self, trait):
-        self.traits.add(trait)
+        self.traits |= trait
 
     def remove_trait(self, trait):
-        self.traits.discard(trait)
-
-    def append(self, name, relationship):
-        match relationship:
-            case Relationship.Kind.HAS:
-                if not name in self.has:
-                    self.has.append(name)
-            case Relationship.Kind.CONTAINS:
-                if not name in self.contains:
-                    self.contains.append(name)
-            case Relationship.Kind.SUPPORTS:
-                if not name in self.supports:
-                    self.supports.append(name)
+        self.traits &= ~trait
 
     @property
     def is_takeable(self):
@@ -68,20 +67,41 @@ class Item:
 
     @property
     def is_taken(self):
-        return self.is_takeable and self.has_trait(Item.Trait.TAKEN)
+        return self.has_trait(Item.Trait.TAKEABLE | Item.Trait.TAKEN)
 
     @property
     def is_open(self):
-        return (self.is_openable or self.is_closable or self.is_container) and not self.has_trait(Item.Trait.CLOSED)
+        return bool(self.traits & Item.ENCLOSING) and not self.traits & Item.Trait.CLOSED
 
     @property
     def is_closed(self):
-        return (self.is_openable or self.is_closable) and self.has_trait(Item.Trait.CLOSED)
+        return bool(self.traits & Item.DOORLIKE) and bool(self.traits & Item.Trait.CLOSED)
 
     @property
     def is_locked(self):
         return self.has_trait(Item.Trait.LOCKED)
 
+    def describe(self, has, contains):
+        facts = []
+        children = []
+        facts.append(f"The [{self.name}] can be described as '{self.description}'")
+        if self.is_closed:
+            facts.append(f"The [{self.name}] is closed")
+        if self.is_open:
+            facts.append(f"The [{self.name}] is open")
+        if self.is_container and len(contains) == 0:
+            facts.append(f"The [{self.name}] is empty")
+        if self.is_locked:
+            facts.append(f"The [{self.name}] is locked")
+        for child in has:
+            facts.append(f"The [{self.name}] has a [{child}]")
+            children.append(child)
+        if not self.is_closed:
+            for child in contains:
+                facts.append(f"The [{self.name}] contains a [{child}]")
+                children.append(child)
+        return facts, children
+
     def take(self):
         if not self.is_takeable:
             return Err(f"[{self.name}] is not takeable")
@@ -96,6 +116,8 @@ class Item:
             return Err(f"[{self.name}] is not openable")
         elif not self.is_closed:
             return Err(f"[{self.name}] is already open")
+        elif self.is_locked:
+            return Err(f"[{self.name}] is locked")
         else:
             self.remove_trait(Item.Trait.CLOSED)
             return Ok(Event.Opened(target=self.name))
@@ -112,6 +134,8 @@ class Item:
 #------------------------------------------------------------------------------
 
 class Items:
+    __slots__ = ("_index",)
+
     def __init__(self, items = []):
         self._index = {item.name: item for item in items}
 
@@ -124,4 +148,7 @@ class Items:
     def names(self):
         return self._index.keys()
 
+    def values(self):
+        return self._index.values()
+
 #------------------------------------------------------------------------------
@@ -0,0 +1,54 @@
+import pickle
+
+#------------------------------------------------------------------------------
+# A Journal is the append-only event log of a Room. Every [every] events the
+# room is snapshot and the events before the snapshot are compacted away, so
+# a long session keeps at most [every] events in memory and can be resumed
+# (see Room.resume) by restoring the latest snapshot and replaying the rest.
+#
+# An optional [sink] (see Store.sink) is told about every append and compact
+# so that the journal can be persisted as it grows.
+#------------------------------------------------------------------------------
+
+class Journal:
+
+    EVERY = 100
+
+    def __init__(self, every = EVERY, snapshot = None, base = 0, events = None):
+        assert every > 0
+        self.every = every
+        self.snapshot = snapshot       # Room.snapshot() taken after [base] events
+        self.base = base               # how many events have been compacted away
+        self.events = events or []     # events since the snapshot
+        self.sink = None
+
+    def __len__(self):
+        return self.base + len(self.events)
+
+    @property
+    def due(self):
+        return len(self.events) >= self.every
+
+    def append(self, event):
+        if self.sink is not None:
+            self.sink.append(len(self), event)
+        self.events.append(event)
+
+    def compact(self, snapshot):
+        self.snapshot = snapshot
+        self.base += len(self.events)
+        self.events = []
+        if self.sink is not None:
+            self.sink.compact(self.every, self.base, self.snapshot)
+
+    #--------------------------------------------------------------------------
+
+    def dump(self):
+        return pickle.dumps((self.every, self.snapshot, self.base, self.events), pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(data):
+        every, snapshot, base, events = pickle.loads(data)
+        return Journal(every, snapshot, base, events)
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,126 @@
+import re
+
+from .command import Command
+
+#------------------------------------------------------------------------------
+# A Parser turns simple imperative utterances ("open the drawer", "please
+# take the gold key") straight into a Command, so that they can be executed
+# without a round trip to the LLM. Verbs and item names are matched, longest
+# phrase first, against word tries. Every other word must be filler, so
+# anything it is not sure about (questions, negations, unknown words, more
+# than one verb or item, aliases shared by several items) returns None and is
+# left for the LLM.
+#------------------------------------------------------------------------------
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+VERBS = {
+    "open":    Command.Open,
+    "close":   Command.Close,
+    "shut":    Command.Close,
+    "take":    Command.Take,
+    "get":     Command.Take,
+    "grab":    Command.Take,
+    "pick up": Command.Take,
+    "unlock":  Command.Unlock,
+}
+
+FILLER = {
+    "a", "an", "the", "my", "that", "this", "up", "out",
+    "please", "now", "just", "go", "ahead", "and",
+    "i", "i'd", "i'll", "want", "like", "to", "let", "let's", "me",
+    "can", "could", "would", "will", "you",
+}
+
+ARTICLES = ("a", "an", "the")
+
+class Parser:
+
+    def __init__(self, names, aliases = None, verbs = VERBS, filler = FILLER):
+        self.verbs = Parser.trie(verbs.items())
+        self.items = Parser.trie([(name, name) for name in names] + list(aliases or []))
+        self.filler = filler
+
+    #--------------------------------------------------------------------------
+
+    def parse(self, text):
+        if text.rstrip().endswith("?"):
+            return None
+
+        words = Parser.words(text)
+        parts = []
+        i = 0
+        while i < len(words):
+            verbs, end = Parser.scan(self.verbs, words, i)
+            if verbs is not None:
+                parts.append(("verb", next(iter(verbs))))
+                i = end
+                continue
+            names, end = Parser.scan(self.items, words, i)
+            if names is not None:
+                if len(names) > 1:
+                    return None
+                parts.append(("item", next(iter(names))))
+            elif words[i] == "with":
+                parts.append(("with", None))
+                end = i + 1
+            elif words[i] in self.filler:
+                end = i + 1
+            else:
+                return None
+            i = end
+
+        match parts:
+            case [("verb", Command.Unlock), ("item", target), ("with", _), ("item", using)]:
+                return Command.Unlock(target=target, using=using)
+            case [("verb", command), ("item", target)] if command is not Command.Unlock:
+                return command(target=target)
+        return None
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def words(text):
+        # the one tokenizer for utterances and the phrases they are matched against
+        return WORD.findall(text.lower())
+
+    @staticmethod
+    def trie(phrases):
+        root = {}
+        for phrase, value in phrases:
+            node = root
+            for word in Parser.words(phrase):
+                node = node.setdefault(word, {})
+            node.setdefault("", set()).add(value)
+        return root
+
+    @staticmethod
+    def scan(trie, words, start):
+        # the longest phrase in [trie] starting at words[start]
+        found, end = None, start
+        node = trie
+        for i in range(start, len(words)):
+            node = node.get(words[i])
+            if node is None:
+                break
+            if "" in node:
+                found, end = node[""], i + 1
+        return found, end
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def build(template):
+        # items can also be called by their description ("the gold key")
+        names = [name for name in template.names() if name != "room"]
+        aliases = []
+        for name in names:
+            description = template.item(name).description
+            if description:
+                words = description.lower().split()
+                if words[0] in ARTICLES:
+                    words = words[1:]
+                aliases.append((" ".join(words), name))
+        return Parser(names, aliases)
+
+#------------------------------------------------------------------------------
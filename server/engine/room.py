@@ -1,71 +1,208 @@
-import json
+import hashlib
+import pickle
 
+from collections import OrderedDict
 from enum import Enum
 from result import Ok, Err
 
+from . import tokens
 from .command import Command
 from .event import Event
 from .item import Item, Items
+from .journal import Journal
 from .relationship import Relationship
+from .template import Template
 
 class Room:
 
-    def __init__(self, name, description, items, relationships):
-        self.name = name
-        self.description = description
-        self.items = items
-        self.items.add(Item(
-            name="room",
-            description=self.description,
-            traits=[]
-        ))
-        self.events = []
+    CHECKPOINTS = 16
+
+    def __init__(self, template, journal = None):
+        self.template = template
+        self.items = Items()     # this session's copies of any items it has touched
+        self.graph = template.graph.overlay()
+        self.journal = Journal() if journal is None else journal
         self.inventory = []
+        self.version = 0
+        self._touched = set()    # items whose own facts no longer match the template
+        self._dirty = set()      # items whose subtree no longer matches the template
+        self._shown = set()      # items that are reachable here but not in the template
+        self._hidden = set()     # items that are reachable in the template but not here
+        self._local = {}
+        self._subtree = {}
+        self._checkpoints = OrderedDict()
+        self._fingerprint = None
+        self._origin = None      # (room, version) this room was forked from
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def description(self):
+        return self.template.description
 
-        for relationship in relationships:
-            item = self.items.get(relationship.source)
-            item.append(relationship.target, relationship.kind)
+    @property
+    def events(self):
+        return self.journal.events
 
     #--------------------------------------------------------------------------
 
     def item(self, name):
-        return self.items.get(name)
+        item = self.items.get(name)
+        if item is None:
+            shared = self.template.item(name)
+            if shared is None:
+                return None
+            item = shared.copy()
+            self.items.add(item)
+        return item
+
+    def _peek(self, name):
+        return self.items.get(name) or self.template.item(name)
+
+    def parent(self, name):
+        found = self.graph.parent(self.graph.id(name))
+        if found is None:
+            return None
+        return self.graph.name(found[0])
+
+    #--------------------------------------------------------------------------
+
+    def reachable(self, name):
+        if name in self._hidden:
+            return False
+        return name in self._shown or name in self.template.reachable()
+
+    def show(self, names):
+        for name in names:
+            self._hidden.discard(name)
+            if not name in self.template.reachable():
+                self._shown.add(name)
+
+    def hide(self, names):
+        for name in names:
+            self._shown.discard(name)
+            if name in self.template.reachable():
+                self._hidden.add(name)
 
     #--------------------------------------------------------------------------
 
     def facts(self, name="room"):
-        facts = []
-        children = []
-        item = self.item(name)
-        facts.append(f"The [{name}] can be described as '{item.description}'")
-        if item.is_closed:
-            facts.append(f"The [{name}] is closed")
-        if item.is_open:
-            facts.append(f"The [{name}] is open")
-        if item.is_container and len(item.contains) == 0:
-            facts.append(f"The [{name}] is empty")
-        if item.is_locked:
-            facts.append(f"The [{name}] is locked")
-        for child in item.has:
-            facts.append(f"The [{name}] has a [{child}]")
-            if not child in children:
-                children.append(child)
-        if not item.is_closed:
-            for child in item.contains:
-                facts.append(f"The [{name}] contains a [{child}]")
-                if not child in children:
-                    children.append(child)
-        for c in children:
-            facts.extend(self.facts(c))
+        if not name in self._dirty:
+            return self.template.facts(name)
+        facts = self._subtree.get(name)
+        if facts is None:
+            facts = self._subtree[name] = Template.flatten(name, self.local_facts, self._shared)
         return facts
 
+    def _shared(self, name):
+        if not name in self._dirty:
+            return self.template.facts(name)
+
+    def stream(self, name="room", max_depth = None, max_facts = None, max_tokens = None):
+        # yields the same facts, in the same order, as facts() but lazily and
+        # without recursion, stopping as soon as any budget would be exceeded
+        remaining_facts  = max_facts
+        remaining_tokens = max_tokens
+        pending = [(name, 0)]
+        while pending:
+            n, depth = pending.pop()
+            local, children = self.local_facts(n)
+            for fact in local:
+                if remaining_facts is not None:
+                    if remaining_facts == 0:
+                        return
+                    remaining_facts -= 1
+                if remaining_tokens is not None:
+                    cost = tokens.count(fact)
+                    if cost > remaining_tokens:
+                        return
+                    remaining_tokens -= cost
+                yield fact
+            if max_depth is None or depth < max_depth:
+                pending.extend((child, depth + 1) for child in reversed(children))
+
+    def local_facts(self, name):
+        if not name in self._touched:
+            return self.template.local_facts(name)
+        cached = self._local.get(name)
+        if cached is None:
+            facts, children = Template.describe(self.graph, self._peek(name))
+            if name == "room":
+                for child in self.inventory:
+                    facts.append(f"The [player] has a [{child}]")
+                    children.append(child)
+            cached = self._local[name] = (facts, children)
+        return cached
+
+    #--------------------------------------------------------------------------
+
+    def checkpoint(self):
+        # cached fact lists are never mutated, only replaced, so a checkpoint
+        # is just a reference to the facts at the current version
+        self._checkpoints[self.version] = self.facts()
+        self._checkpoints.move_to_end(self.version)
+        while len(self._checkpoints) > Room.CHECKPOINTS:
+            self._checkpoints.popitem(last=False)
+        return self.version
+
+    def diff(self, since):
+        previous = self._checkpoints.get(since)
+        if previous is None:
+            return Err(f"unknown checkpoint {since}")
+        current = self.facts()
+        if current is previous:
+            return Ok(([], []))
+        before = set(previous)
+        after  = set(current)
+        added   = [fact for fact in current  if not fact in before]
+        removed = [fact for fact in previous if not fact in after]
+        return Ok((added, removed))
+
+    def fingerprint(self):
+        # a digest of facts(), equal for any two rooms (in any session) that
+        # are in the same state, recomputed only when the facts are replaced
+        facts = self.facts()
+        if self._fingerprint is None or self._fingerprint[0] is not facts:
+            digest = hashlib.blake2b("\n".join(facts).encode("utf-8"), digest_size=16).hexdigest()
+            self._fingerprint = (facts, digest)
+        return self._fingerprint[1]
+
+    #--------------------------------------------------------------------------
+
+    def touch(self, *names):
+        # facts are cached per item, so a change to [name] only invalidates
+        # its own facts and the subtree facts of each of its ancestors, taken
+        # items are detached from the graph but still hang off the room
+        for name in names:
+            self._touched.add(name)
+            self._local.pop(name, None)
+            id = self.graph.id(name)
+            while id is not None:
+                name = self.graph.name(id)
+                self._dirty.add(name)
+                self._subtree.pop(name, None)
+                found = self.graph.parent(id)
+                if found is not None:
+                    id = found[0]
+                elif name in self.inventory:
+                    id = self.graph.id("room")
+                else:
+                    id = None
+
     #--------------------------------------------------------------------------
 
     def execute(self, command):
         match command:
+            case Command.Open() | Command.Close() | Command.Take() if not self.reachable(command.target):
+                return Err(f"[{command.target}] is not visible")
             case Command.Open():
                 item = self.item(command.target)
                 return self.record(item.open())
+            case Command.Close():
+                item = self.item(command.target)
+                return self.record(item.close())
             case Command.Take():
                 item = self.item(command.target)
                 return self.record(item.take())
@@ -80,46 +217,154 @@ class Room:
         elif isinstance(result, Err):
             pass
         elif isinstance(result, Event):
-            self.events.append(result)
+            self.journal.append(result)
+            self.apply(result)
+            if self.journal.due:
+                self.journal.compact(self.snapshot())
         elif isinstance(result, list):
-            self.events.extend(result)
+            for event in result:
+                self.record(event)
         return result
 
     #--------------------------------------------------------------------------
 
+    def replay(self, event):
+        item = self.item(event.target)
+        match event:
+            case Event.Opened():
+                item.remove_trait(Item.Trait.CLOSED)
+            case Event.Closed():
+                item.add_trait(Item.Trait.CLOSED)
+            case Event.Unlocked():
+                item.remove_trait(Item.Trait.LOCKED)
+            case Event.Taken():
+                item.add_trait(Item.Trait.TAKEN)
+        return self.record(event)
+
+    def apply(self, event):
+        self.version += 1
+        match event:
+            case Event.Taken():
+                id = self.graph.id(event.target)
+                parent = self.graph.detach(id)
+                self.inventory.append(event.target)
+                if parent is not None:
+                    self.touch(self.graph.name(parent))
+                self.touch(event.target, "room")
+            case Event.Opened():
+                self.touch(event.target)
+                if self.reachable(event.target):
+                    for child in self.graph.children(self.graph.id(event.target), Relationship.Kind.CONTAINS):
+                        self.show(Template.reach(self.graph, self._peek, self.graph.name(child)))
+            case Event.Closed():
+                self.touch(event.target)
+                self.hide(Template.below(self.graph, event.target, Relationship.Kind.CONTAINS))
+            case _:
+                self.touch(event.target)
+
+    #--------------------------------------------------------------------------
+
+    def fork(self):
+        # a copy-on-write view of this room to try commands against without
+        # changing it, only this session's changes are copied (the template is
+        # shared) and so are the fact caches, since cached facts are only ever
+        # replaced, never mutated
+        fork = Room(self.template)
+        fork.items = Items(item.copy() for item in self.items.values())
+        fork.graph = self.graph.copy()
+        fork.inventory = list(self.inventory)
+        fork.version = self.version
+        fork._touched = set(self._touched)
+        fork._dirty = set(self._dirty)
+        fork._shown = set(self._shown)
+        fork._hidden = set(self._hidden)
+        fork._local = dict(self._local)
+        fork._subtree = dict(self._subtree)
+        fork._checkpoints = OrderedDict(self._checkpoints)
+        fork._fingerprint = self._fingerprint
+        fork._origin = (self, self.version)
+        return fork
+
+    def merge(self, fork):
+        # adopts the state of a fork, and journals the events recorded in it,
+        # as long as the fork was taken from this room and neither has changed
+        # in any other way since
+        origin, version = fork._origin or (None, None)
+        if origin is not self or version != self.version:
+            return Err("the room has changed since it was forked")
+        if fork.journal.base != 0:
+            return Err("the fork has been compacted")
+        events = fork.journal.events
+        self.items = fork.items
+        self.graph = fork.graph
+        self.inventory = fork.inventory
+        self.version = fork.version
+        self._touched = fork._touched
+        self._dirty = fork._dirty
+        self._shown = fork._shown
+        self._hidden = fork._hidden
+        self._local = fork._local
+        self._subtree = fork._subtree
+        self._fingerprint = fork._fingerprint
+        fork._origin = None
+        for event in events:
+            self.journal.append(event)
+        if self.journal.due:
+            self.journal.compact(self.snapshot())
+        return Ok(events)
+
+    #--------------------------------------------------------------------------
+
+    def snapshot(self):
+        items = [(item.name, int(item.traits)) for item in self.items.values()]
+        return pickle.dumps((
+            self.version,
+            items,
+            self.graph.dump(),
+            self.inventory,
+            self._touched,
+            self._shown,
+            self._hidden,
+        ), pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def restore(template, snapshot, journal = None):
+        room = Room(template, journal)
+        version, items, graph, inventory, touched, shown, hidden = pickle.loads(snapshot)
+        known = lambda name: template.item(name) is not None    # the world may have been edited since
+        for name, traits in items:
+            if known(name):
+                room.item(name).traits = Item.Trait(traits)
+        room.graph.restore(graph)
+        room.version   = version
+        room.inventory = [name for name in inventory if known(name)]
+        room.touch(*filter(known, touched))
+        room.show(shown)
+        room.hide(hidden)
+        return room
+
+    @staticmethod
+    def resume(template, journal):
+        # restores the latest snapshot in the journal and replays the events
+        # recorded after it
+        events = journal.events
+        journal = Journal(journal.every, journal.snapshot, journal.base)
+        if journal.snapshot is None:
+            room = Room(template, journal)
+        else:
+            room = Room.restore(template, journal.snapshot, journal)
+        for event in events:
+            room.replay(event)
+        return room
+
+    #--------------------------------------------------------------------------
+
     @staticmethod
     def load(filename):
-        return Room.from_json(json.load(open(filename)))
+        return Room(Template.load(filename))
 
     @staticmethod
     def from_json(data):
-        name = data.get("name")
-        description = data.get("description")
-
-        assert name is not None
-        assert description is not None
-
-        items = Items()
-        for i in data.get("items", []):
-            items.add(Item(
-                name=i.get("name"),
-                description=i.get("description"),
-                traits=[Item.Trait(t) for t in i.get("traits", [])]
-            ))
-
-        relationships = []
-        for r in data.get("relationships", []):
-            relationships.append(Relationship(
-                kind=Relationship.Kind(r.get("relationship") or r.get("kind")),
-                source=r.get("source"),
-                target=r.get("target")
-            ))
-
-        return Room(
-            name=name,
-            description=description,
-            items=items,
-            relationships=relationships,
-        )
+        return Room(Template.from_json(data))
 
     #--------------------------------------------------------------------------
@@ -0,0 +1,54 @@
+from .command import Command
+
+#------------------------------------------------------------------------------
+# A Speculator dry-runs the command in each interim transcript against a fork
+# of the room (see Room.fork), and precomputes the facts it would lead to,
+# while turn detection is still deciding whether the user has finished. When
+# the final transcript turns out to be the same command the fork is merged
+# back into the room, so the command is committed without being executed
+# again, otherwise the speculation is simply discarded.
+#------------------------------------------------------------------------------
+
+class Speculation:
+    __slots__ = ("command", "fork", "result")
+
+    def __init__(self, command, fork, result):
+        self.command = command
+        self.fork = fork
+        self.result = result
+
+class Speculator:
+
+    def __init__(self):
+        self.current = None
+        self.hits = 0
+        self.misses = 0
+
+    def speculate(self, room, command):
+        # the speculative result of executing [command] in [room]
+        current = self.current
+        if current is not None and current.command == command and current.fork._origin == (room, room.version):
+            return current.result
+        if command is None or isinstance(command, Command.Unlock):  # the engine cannot unlock yet
+            self.current = None
+            return None
+        fork = room.fork()
+        result = fork.execute(command)
+        fork.facts()
+        self.current = Speculation(command, fork, result)
+        return result
+
+    def commit(self, room, command):
+        # the result of executing [command] in [room], reusing the speculation if it matches
+        current, self.current = self.current, None
+        if current is not None and current.command == command:
+            if room.merge(current.fork).is_ok():
+                self.hits += 1
+                return current.result
+        self.misses += 1
+        return room.execute(command)
+
+    def discard(self):
+        self.current = None
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,215 @@
+import logging
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+
+from contextlib import closing
+
+from .journal import Journal
+
+log = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+# A Store persists session journals (see Journal) to a local SQLite database
+# in WAL mode. Writes are queued and committed in batches by a background
+# thread, so recording an event never waits on the disk, only reads do.
+# Several processes may share the database, so a batch that finds it locked
+# waits up to [timeout] and is retried [retries] times before it is dropped
+# (and logged), a failed batch never stops the writer.
+#
+#   sessions   session -> current location
+#   snapshots  (session, room) -> latest snapshot and how many events it covers
+#   events     (session, room, seq) -> event, only those after the snapshot
+#------------------------------------------------------------------------------
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session  TEXT PRIMARY KEY,
+        location TEXT NOT NULL,
+        updated  REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS snapshots (
+        session  TEXT NOT NULL,
+        room     TEXT NOT NULL,
+        every    INTEGER NOT NULL,
+        base     INTEGER NOT NULL,
+        snapshot BLOB,
+        PRIMARY KEY (session, room)
+    );
+    CREATE TABLE IF NOT EXISTS events (
+        session  TEXT NOT NULL,
+        room     TEXT NOT NULL,
+        seq      INTEGER NOT NULL,
+        event    BLOB NOT NULL,
+        PRIMARY KEY (session, room, seq)
+    );
+"""
+
+class Store:
+
+    BATCH    = 256     # most writes committed in one transaction
+    INTERVAL = 0.05    # longest a write waits for others to batch with
+    TIMEOUT  = 5.0     # longest a statement waits for a lock held by another connection
+    RETRIES  = 3       # times a failed batch is retried before it is dropped
+
+    def __init__(self, path, batch = BATCH, interval = INTERVAL, timeout = TIMEOUT, retries = RETRIES):
+        self.path = path
+        self.batch = batch
+        self.interval = interval
+        self.timeout = timeout
+        self.retries = retries
+        self.queue = queue.SimpleQueue()
+        self.writes = 0
+        self.commits = 0
+        self.errors = 0
+        self.closed = False
+        connection = self.connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        self.thread = threading.Thread(target=self.run, name="store", daemon=True)
+        self.thread.start()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    #--------------------------------------------------------------------------
+    # writes, safe to call from the event loop
+    #--------------------------------------------------------------------------
+
+    def sink(self, session, room):
+        return Sink(self, session, room)
+
+    def locate(self, session, location):
+        self.queue.put(("locate", session, location, time.time()))
+
+    def expire(self, age):
+        # forgets every session that has not moved, or ended, in [age] seconds
+        self.queue.put(("expire", time.time() - age))
+
+    def flush(self):
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        while not done.wait(self.interval):
+            if not self.thread.is_alive():
+                raise RuntimeError("the store is closed")
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put(None)
+            self.thread.join()
+
+    #--------------------------------------------------------------------------
+    # reads, these wait for pending writes and touch the disk
+    #--------------------------------------------------------------------------
+
+    def location(self, session):
+        self.flush()
+        with closing(self.connect()) as connection:
+            row = connection.execute("SELECT location FROM sessions WHERE session = ?", (session,)).fetchone()
+        return None if row is None else row[0]
+
+    def journals(self, session):
+        self.flush()
+        journals = {}
+        with closing(self.connect()) as connection:
+            for room, every, base, snapshot in connection.execute(
+                "SELECT room, every, base, snapshot FROM snapshots WHERE session = ?", (session,)):
+                journals[room] = Journal(every, snapshot, base)
+            for room, seq, event in connection.execute(
+                "SELECT room, seq, event FROM events WHERE session = ? ORDER BY room, seq", (session,)):
+                journal = journals.setdefault(room, Journal())
+                if seq >= journal.base:
+                    journal.append(pickle.loads(event))
+        return journals
+
+    #--------------------------------------------------------------------------
+    # the background writer
+    #--------------------------------------------------------------------------
+
+    def run(self):
+        with closing(self.connect()) as connection:
+            running = True
+            while running:
+                writes = [self.queue.get()]
+                deadline = time.monotonic() + self.interval
+                while len(writes) < self.batch and writes[-1] is not None and writes[-1][0] != "flush":
+                    try:
+                        writes.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+                last = writes[-1]    # a batch only ever ends with a close or a flush
+                if last is None or last[0] == "flush":
+                    writes.pop()
+                self.commit(connection, writes)
+                if last is None:
+                    running = False
+                elif last[0] == "flush":
+                    last[1].set()
+
+    def commit(self, connection, writes):
+        for attempt in range(self.retries + 1):
+            try:
+                with connection:
+                    for write in writes:
+                        self.write(connection, write)
+            except Exception as error:
+                if attempt == self.retries:
+                    self.errors += 1
+                    log.error(f"dropped {len(writes)} writes to {self.path}: {error!r}")
+                    return
+                log.warning(f"retrying {len(writes)} writes to {self.path}: {error!r}")
+                time.sleep(self.interval * 2 ** attempt)
+            else:
+                self.writes += len(writes)
+                self.commits += 1
+                return
+
+    def write(self, connection, write):
+        match write:
+            case ("event", session, room, seq, event):
+                connection.execute(
+                    "INSERT OR REPLACE INTO events (session, room, seq, event) VALUES (?, ?, ?, ?)",
+                    (session, room, seq, pickle.dumps(event, pickle.HIGHEST_PROTOCOL)))
+            case ("snapshot", session, room, every, base, snapshot):
+                connection.execute(
+                    "INSERT OR REPLACE INTO snapshots (session, room, every, base, snapshot) VALUES (?, ?, ?, ?, ?)",
+                    (session, room, every, base, snapshot))
+                connection.execute(
+                    "DELETE FROM events WHERE session = ? AND room = ? AND seq < ?",
+                    (session, room, base))
+            case ("locate", session, location, updated):
+                connection.execute(
+                    "INSERT OR REPLACE INTO sessions (session, location, updated) VALUES (?, ?, ?)",
+                    (session, location, updated))
+            case ("expire", cutoff):
+                for table in ("events", "snapshots"):
+                    connection.execute(
+                        f"DELETE FROM {table} WHERE session IN (SELECT session FROM sessions WHERE updated < ?)",
+                        (cutoff,))
+                connection.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,))
+
+#------------------------------------------------------------------------------
+# a Sink is attached to a Journal and forwards its changes to the Store
+#------------------------------------------------------------------------------
+
+class Sink:
+    __slots__ = ("store", "session", "room")
+
+    def __init__(self, store, session, room):
+        self.store = store
+        self.session = session
+        self.room = room
+
+    def append(self, seq, event):
+        self.store.queue.put(("event", self.session, self.room, seq, event))
+
+    def compact(self, every, base, snapshot):
+        self.store.queue.put(("snapshot", self.session, self.room, every, base, snapshot))
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,190 @@
+import json
+import os
+
+from types import MappingProxyType
+
+from .graph import Graph
+from .item import Item
+from .relationship import Relationship
+from .worldfile import WorldFile
+
+#------------------------------------------------------------------------------
+# A Template is the parsed, shared, read-only form of a world file. It is
+# loaded once per process (see Template.load) and shared by every Room that
+# plays it, each Room keeping only its own changes as an overlay on top.
+#------------------------------------------------------------------------------
+
+class Template:
+    __slots__ = ("name", "description", "items", "graph", "_local", "_facts", "_reachable")
+
+    _cache = {}
+
+    def __init__(self, name, description, items, graph):
+        self.name = name
+        self.description = description
+        self.items = items
+        self.graph = graph
+        self._local = {}
+        self._facts = {}
+        self._reachable = None
+
+    #--------------------------------------------------------------------------
+
+    def item(self, name):
+        return self.items.get(name)
+
+    def names(self):
+        return self.items.keys()
+
+    #--------------------------------------------------------------------------
+
+    def facts(self, name="room"):
+        facts = self._facts.get(name)
+        if facts is None:
+            facts = self._facts[name] = Template.flatten(name, self.local_facts, self._facts.get)
+        return facts
+
+    @staticmethod
+    def flatten(name, local_facts, shared):
+        # builds the facts for [name] and everything below it in a single
+        # pre-order pass with an explicit stack, so that deep worlds cannot hit
+        # the recursion limit, reusing the facts of any [shared] subtree as is
+        facts = []
+        pending = [name]
+        while pending:
+            n = pending.pop()
+            subtree = shared(n) if n != name else None
+            if subtree is not None:
+                facts.extend(subtree)
+            else:
+                local, children = local_facts(n)
+                facts.extend(local)
+                pending.extend(reversed(children))
+        return facts
+
+    def local_facts(self, name):
+        cached = self._local.get(name)
+        if cached is None:
+            cached = self._local[name] = Template.describe(self.graph, self.item(name))
+        return cached
+
+    def reachable(self):
+        if self._reachable is None:
+            self._reachable = frozenset(Template.reach(self.graph, self.item, "room"))
+        return self._reachable
+
+    @staticmethod
+    def reach(graph, item, name):
+        # yields [name] and every item below it that can be seen from it, the
+        # contents of a closed item cannot be seen
+        pending = [graph.id(name)]
+        while pending:
+            id = pending.pop()
+            name = graph.name(id)
+            yield name
+            pending.extend(graph.children(id, Relationship.Kind.HAS))
+            if not item(name).is_closed:
+                pending.extend(graph.children(id, Relationship.Kind.CONTAINS))
+
+    @staticmethod
+    def below(graph, name, kind):
+        # yields every item below [name] that is reached through a [kind] relationship
+        pending = list(graph.children(graph.id(name), kind))
+        while pending:
+            id = pending.pop()
+            yield graph.name(id)
+            for k in Graph.KINDS:
+                pending.extend(graph.children(id, k))
+
+    @staticmethod
+    def describe(graph, item):
+        id = graph.id(item.name)
+        has      = [graph.name(child) for child in graph.children(id, Relationship.Kind.HAS)]
+        contains = [graph.name(child) for child in graph.children(id, Relationship.Kind.CONTAINS)]
+        return item.describe(has, contains)
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def build(name, description, items, relationships):
+        index = {item.name: item for item in items}
+        index["room"] = Item(
+            name="room",
+            description=description,
+        )
+        return Template(
+            name=name,
+            description=description,
+            items=MappingProxyType(index),
+            graph=Graph.build(index.keys(), relationships),
+        )
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def load(filename):
+        path = os.path.abspath(filename)
+        mtime = os.stat(path).st_mtime_ns
+        cached = Template._cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, Template.read(path, mtime))
+            Template._cache[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def read(path, mtime):
+        # prefer the compiled .world file, unless it is missing or was compiled
+        # from an older version of the json source
+        if WorldFile.is_compiled(path):
+            world = WorldFile.open(path)
+        elif os.path.exists(WorldFile.path(path)):
+            world = WorldFile.open(WorldFile.path(path), source_mtime=mtime)
+        else:
+            world = None
+
+        if world is None:
+            with open(path) as file:
+                return Template.from_json(json.load(file))
+
+        return Template(
+            name=world.name,
+            description=world.description,
+            items=world.items,
+            graph=world.graph,
+        )
+
+    def compile(self, target, source_mtime = 0):
+        return WorldFile.compile(self, target, source_mtime)
+
+    @staticmethod
+    def from_json(data):
+        name = data.get("name")
+        description = data.get("description")
+
+        assert name is not None
+        assert description is not None
+
+        items = []
+        for i in data.get("items", []):
+            items.append(Item(
+                name=i.get("name"),
+                description=i.get("description"),
+                traits=[Item.Trait.parse(t) for t in i.get("traits", [])]
+            ))
+
+        relationships = []
+        for r in data.get("relationships", []):
+            relationships.append(Relationship(
+                kind=Relationship.Kind(r.get("relationship") or r.get("kind")),
+                source=r.get("source"),
+                target=r.get("target")
+            ))
+
+        return Template.build(
+            name=name,
+            description=description,
+            items=items,
+            relationships=relationships,
+        )
+
+    #--------------------------------------------------------------------------
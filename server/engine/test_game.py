@@ -0,0 +1,99 @@
+import pytest
+from .game import Game, LiveRooms
+from .command import Command
+from .event import Event
+
+#------------------------------------------------------------------------------
+
+def test_rooms_are_loaded_when_entered():
+
+    game = Game.load("data/example.json")
+    assert game.name == "An Example Adventure"
+    assert sorted(game.rooms) == ["hall", "study"]
+    assert game.location == "study"
+    assert len(game.live) == 0
+
+    assert game.room.name == "The First Room"
+    assert list(game.live) == ["study"]
+
+    result = game.go("north")
+    assert result.is_ok()
+    assert result.ok_value.name == "The Hall"
+    assert list(game.live) == ["study", "hall"]
+
+    result = game.go("north")
+    assert result.is_err()
+    assert result.err_value == "there is no exit north"
+
+    result = game.enter("attic")
+    assert result.is_err()
+    assert result.err_value == "[attic] is not a room"
+
+#------------------------------------------------------------------------------
+
+def test_cold_rooms_are_evicted_and_restored():
+
+    game = Game.load("data/example.json", capacity=1)
+
+    study = game.room
+    study.execute(Command.Open(target="drawer"))
+
+    game.go("north")
+    assert list(game.live) == ["hall"]
+    assert list(game.evicted) == ["study"]
+
+    game.go("south")
+    assert list(game.live) == ["study"]
+    assert list(game.evicted) == ["hall"]
+
+    restored = game.room
+    assert restored is not study
+    assert restored.version == study.version
+    assert restored.events  == [Event.Opened(target="drawer")]
+    assert restored.facts() == study.facts()
+    assert restored.item("drawer").is_open == True
+
+#------------------------------------------------------------------------------
+
+def test_live_rooms_are_bounded_per_process():
+
+    live  = LiveRooms(capacity=2)
+    first = Game.load("data/example.json", live=live)
+    other = Game.load("data/example.json", live=live)
+
+    first.room.execute(Command.Open(target="drawer"))
+    first.go("north")
+    assert list(first.live) == ["study", "hall"]
+
+    other.room                                            # a second session evicts the first's coldest room
+    assert len(live) == 2
+    assert list(first.live) == ["hall"]
+    assert list(first.evicted) == ["study"]
+    assert list(other.live) == ["study"]
+
+    third = Game.load("data/example.json", live=live)
+    third.room                                            # current rooms are never evicted
+    assert len(live) == 3
+    assert list(first.live) == ["hall"]
+
+    first.go("south")
+    assert first.room.item("drawer").is_open == True      # resumed from its journal
+
+    first.close()
+    assert list(first.live) == []
+    assert len(live) == 2
+
+#------------------------------------------------------------------------------
+
+def test_rooms_are_not_evicted_as_they_are_loaded():
+
+    game = Game.load("data/example.json", capacity=1)
+    game.room
+
+    hall = game.get("hall")                               # not current, but the only other room is
+    assert hall.execute(Command.Open(target="chest")).is_ok()
+    assert game.get("hall") is hall
+    assert game.get("hall").item("chest").is_open == True
+    assert list(game.live) == ["study", "hall"]
+
+#------------------------------------------------------------------------------
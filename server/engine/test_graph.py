@@ -0,0 +1,76 @@
+import pytest
+from .graph import Graph
+from .relationship import Relationship
+
+HAS      = Relationship.Kind.HAS
+CONTAINS = Relationship.Kind.CONTAINS
+
+#------------------------------------------------------------------------------
+
+def build():
+    return Graph.build(["room", "desk", "drawer", "key", "coin"], [
+        Relationship(HAS,      "room",   "desk"),
+        Relationship(HAS,      "desk",   "drawer"),
+        Relationship(CONTAINS, "drawer", "key"),
+        Relationship(CONTAINS, "drawer", "coin"),
+        Relationship(CONTAINS, "drawer", "coin"),
+    ])
+
+def names(graph, ids):
+    return [graph.name(id) for id in ids]
+
+#------------------------------------------------------------------------------
+
+def test_graph():
+
+    graph = build()
+    room, desk, drawer, key, coin = [graph.id(n) for n in ["room", "desk", "drawer", "key", "coin"]]
+
+    assert len(graph) == 5
+    assert graph.id("missing") is None
+
+    assert names(graph, graph.children(room,   HAS))      == ["desk"]
+    assert names(graph, graph.children(drawer, CONTAINS)) == ["key", "coin"]
+    assert names(graph, graph.children(drawer, HAS))      == []
+
+    assert graph.parent(room) is None
+    assert graph.parent(key)  == (drawer, CONTAINS)
+    assert graph.parent(desk) == (room, HAS)
+
+    with pytest.raises(AssertionError):
+        Graph.build(["room", "desk", "key"], [
+            Relationship(HAS, "room", "key"),
+            Relationship(HAS, "desk", "key"),
+        ])
+
+#------------------------------------------------------------------------------
+
+def test_overlay():
+
+    graph = build()
+    room, desk, drawer, key, coin = [graph.id(n) for n in ["room", "desk", "drawer", "key", "coin"]]
+
+    first  = graph.overlay()
+    second = graph.overlay()
+
+    assert first.contains(drawer, key) == True
+    assert first.detach(key) == drawer
+    assert first.contains(drawer, key) == False
+    assert first.parent(key) is None
+    assert first.detach(key) is None
+    assert names(graph, first.children(drawer, CONTAINS)) == ["coin"]
+
+    first.attach(coin, desk, HAS)
+    assert first.parent(coin) == (desk, HAS)
+    assert names(graph, first.children(drawer, CONTAINS)) == []
+    assert names(graph, first.children(desk, HAS))        == ["drawer", "coin"]
+
+    assert second.contains(drawer, key) == True
+    assert names(graph, graph.children(drawer, CONTAINS)) == ["key", "coin"]
+
+    restored = graph.overlay()
+    restored.restore(first.dump())
+    assert restored.parent(key)  is None
+    assert restored.parent(coin) == (desk, HAS)
+
+#------------------------------------------------------------------------------
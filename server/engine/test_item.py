@@ -77,6 +77,17 @@ def test_openable():
 
 #------------------------------------------------------------------------------
 
+def test_locked_items_cannot_be_opened():
+
+    item = Item(THING, traits=[Item.Trait.OPENABLE, Item.Trait.CLOSED, Item.Trait.LOCKED])
+
+    result = item.open()
+    assert result.is_err()
+    assert result.err_value == "[thing] is locked"
+    assert item.is_closed   == True
+
+#------------------------------------------------------------------------------
+
 def test_closable():
 
     item = Item(THING, traits=[Item.Trait.CLOSABLE])
@@ -194,3 +205,33 @@ def test_items():
     ])
 
 #------------------------------------------------------------------------------
+
+def test_traits():
+
+    assert Item.Trait.parse("takeable") == Item.Trait.TAKEABLE
+    assert Item.Trait.parse("CLOSED")   == Item.Trait.CLOSED
+
+    item = Item(THING, traits=Item.Trait.OPENABLE | Item.Trait.CLOSED)
+    assert item.traits    == Item.Trait.OPENABLE | Item.Trait.CLOSED
+    assert item.is_closed == True
+
+    item.remove_trait(Item.Trait.CLOSED)
+    assert item.traits    == Item.Trait.OPENABLE
+    assert item.is_open   == True
+
+    with pytest.raises(AttributeError):
+        item.color = "red"
+
+#------------------------------------------------------------------------------
+
+def test_events_are_values():
+
+    assert Event.Opened(target=THING) == Event.Opened(target=THING)
+    assert Event.Opened(target=THING) != Event.Closed(target=THING)
+    assert Event.Opened(target=THING) != Event.Opened(target="other")
+    assert len({Event.Taken(target=THING), Event.Taken(target=THING)}) == 1
+
+    with pytest.raises(AttributeError):
+        Event.Taken(target=THING).target = "other"
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,97 @@
+import json
+import pytest
+from .journal import Journal
+from .room import Room
+from .template import Template
+from .command import Command
+from .event import Event
+
+#------------------------------------------------------------------------------
+
+def test_journal():
+
+    journal = Journal(every=2)
+    assert len(journal) == 0
+    assert journal.due  == False
+
+    journal.append(Event.Opened(target="drawer"))
+    journal.append(Event.Taken(target="key"))
+    assert len(journal) == 2
+    assert journal.due  == True
+
+    journal.compact(b"snapshot")
+    assert len(journal)     == 2
+    assert journal.base     == 2
+    assert journal.events   == []
+    assert journal.snapshot == b"snapshot"
+
+    loaded = Journal.load(journal.dump())
+    assert loaded.every    == 2
+    assert loaded.base     == 2
+    assert loaded.snapshot == b"snapshot"
+
+#------------------------------------------------------------------------------
+
+def test_rooms_compact_their_journal():
+
+    template = Template.load("data/room1.json")
+    room = Room(template, Journal(every=2))
+
+    room.execute(Command.Open(target="drawer"))
+    assert room.events == [Event.Opened(target="drawer")]
+    assert room.journal.snapshot is None
+
+    room.execute(Command.Take(target="key"))
+    assert room.events == []
+    assert len(room.journal) == 2
+    assert room.journal.snapshot is not None
+
+    room.execute(Command.Close(target="drawer"))
+    assert room.events == [Event.Closed(target="drawer")]
+
+    resumed = Room.resume(template, Journal.load(room.journal.dump()))
+    assert resumed.version   == room.version
+    assert resumed.inventory == ["key"]
+    assert resumed.events    == [Event.Closed(target="drawer")]
+    assert resumed.facts()   == room.facts()
+    assert resumed.item("drawer").is_closed == True
+    assert resumed.reachable("key") == True
+
+#------------------------------------------------------------------------------
+
+def test_resume_replays_from_the_start_without_a_snapshot():
+
+    template = Template.load("data/room1.json")
+    room = Room(template)
+    room.execute(Command.Open(target="drawer"))
+    room.execute(Command.Take(target="key"))
+
+    resumed = Room.resume(template, room.journal)
+    assert resumed.events  == room.events
+    assert resumed.facts() == room.facts()
+    assert room.events == [Event.Opened(target="drawer"), Event.Taken(target="key")]
+
+#------------------------------------------------------------------------------
+
+def test_snapshots_survive_a_renumbered_or_edited_world():
+
+    with open("data/room1.json") as file:
+        data = json.load(file)
+    room = Room(Template.from_json(data), Journal(every=2))
+    room.execute(Command.Open(target="drawer"))
+    room.execute(Command.Take(target="key"))
+    assert room.journal.snapshot is not None
+
+    data["items"].reverse()                                    # the same world, with every item numbered differently
+    renumbered = Room.resume(Template.from_json(data), room.journal)
+    assert renumbered.inventory == ["key"]
+    assert renumbered.facts()   == room.facts()
+
+    data["items"] = [i for i in data["items"] if i["name"] != "key"]
+    data["relationships"] = [r for r in data["relationships"] if r["target"] != "key"]
+    edited = Room.resume(Template.from_json(data), room.journal)
+    assert edited.inventory == []
+    assert edited.item("drawer").is_open == True
+    assert not any("[key]" in fact for fact in edited.facts())
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,46 @@
+import pytest
+from .parser import Parser
+from .template import Template
+from .command import Command
+
+#------------------------------------------------------------------------------
+
+def test_parse_simple_commands():
+
+    parser = Parser.build(Template.load("data/room1.json"))
+
+    assert parser.parse("open the drawer")              == Command.Open(target="drawer")
+    assert parser.parse("Close the drawer, please.")    == Command.Close(target="drawer")
+    assert parser.parse("shut drawer")                  == Command.Close(target="drawer")
+    assert parser.parse("take the gold key")            == Command.Take(target="key")
+    assert parser.parse("can you pick up the key")      == Command.Take(target="key")
+    assert parser.parse("I want to grab the key")       == Command.Take(target="key")
+    assert parser.parse("unlock the door with the key") == Command.Unlock(target="door", using="key")
+
+#------------------------------------------------------------------------------
+
+def test_parse_leaves_anything_unclear_to_the_llm():
+
+    parser = Parser.build(Template.load("data/room1.json"))
+
+    assert parser.parse("") is None
+    assert parser.parse("hello there") is None
+    assert parser.parse("don't open the drawer") is None
+    assert parser.parse("can you open the drawer?") is None
+    assert parser.parse("open the drawer and take the key") is None
+    assert parser.parse("open the drawer slowly") is None
+    assert parser.parse("open the fridge") is None
+    assert parser.parse("open") is None
+    assert parser.parse("unlock the door") is None
+    assert parser.parse("open the door with the key") is None
+
+#------------------------------------------------------------------------------
+
+def test_parse_ambiguous_aliases():
+
+    parser = Parser(["box1", "box2"], aliases=[("red box", "box1"), ("red box", "box2")])
+
+    assert parser.parse("open box2")        == Command.Open(target="box2")
+    assert parser.parse("open the red box") is None
+
+#------------------------------------------------------------------------------
@@ -1,3 +1,4 @@
+import json
 import pytest
 from .room import Room
 from .command import Command
@@ -52,6 +53,26 @@ def test():
     result = room.execute(Command.Take(target="key"))
     assert result.is_ok()
     assert result.ok_value == Event.Taken(target="key")
+    assert room.inventory == ["key"]
+    assert room.parent("key") is None
+
+    assert room.facts() == [
+        "The [room] can be described as 'a dusty study'",
+        "The [room] has a [desk]",
+        "The [room] has a [floor]",
+        "The [room] has a [door]",
+        "The [player] has a [key]",
+        "The [desk] can be described as 'a plain desk'",
+        "The [desk] has a [drawer]",
+        "The [drawer] can be described as 'a simple drawer'",
+        "The [drawer] is open",
+        "The [drawer] is empty",
+        "The [floor] can be described as 'a plain wooden floor'",
+        "The [door] can be described as 'a plain wooden door with a simple keyhole'",
+        "The [door] is closed",
+        "The [door] is locked",
+        "The [key] can be described as 'a gold key'",
+    ]
 
     # assert room.facts() == [
     #     "The [room] can be described as 'a dusty study'",
@@ -101,3 +122,259 @@ def test():
     # ]
 
 #------------------------------------------------------------------------------
+
+def test_facts_are_cached_until_touched():
+
+    room = Room.load("data/room1.json")
+    assert room.version == 0
+
+    facts  = room.facts()
+    desk   = room.facts("desk")
+    drawer = room.facts("drawer")
+    floor  = room.facts("floor")
+    door   = room.facts("door")
+
+    assert room.facts() is facts
+
+    result = room.execute(Command.Open(target="drawer"))
+    assert result.is_ok()
+    assert room.version == 1
+
+    assert room.facts("floor")  is floor
+    assert room.facts("door")   is door
+    assert room.facts("drawer") is not drawer
+    assert room.facts("desk")   is not desk
+    assert room.facts()         is not facts
+
+    assert "The [drawer] contains a [key]" in room.facts()
+
+    result = room.execute(Command.Open(target="drawer"))
+    assert result.is_err()
+    assert room.version == 1
+
+#------------------------------------------------------------------------------
+
+def test_rooms_share_their_template():
+
+    first  = Room.load("data/room1.json")
+    second = Room.load("data/room1.json")
+
+    assert first.template is second.template
+    assert first.facts() is second.facts()
+
+    first.execute(Command.Open(target="drawer"))
+
+    assert first.item("drawer").is_open    == True
+    assert second.item("drawer").is_closed == True
+    assert first.template.item("drawer").is_closed == True
+
+    assert "The [drawer] is open"   in first.facts()
+    assert "The [drawer] is closed" in second.facts()
+    assert first.facts("door") is second.facts("door")
+
+#------------------------------------------------------------------------------
+
+def test_diff_since_checkpoint():
+
+    room = Room.load("data/room1.json")
+
+    start = room.checkpoint()
+    assert room.diff(start).ok_value == ([], [])
+
+    room.execute(Command.Open(target="drawer"))
+    opened = room.checkpoint()
+
+    assert room.diff(start).ok_value == (
+        [
+            "The [drawer] is open",
+            "The [drawer] contains a [key]",
+            "The [key] can be described as 'a gold key'",
+        ],
+        [
+            "The [drawer] is closed",
+        ],
+    )
+
+    room.execute(Command.Close(target="drawer"))
+    assert room.diff(start).ok_value == ([], [])
+    assert room.diff(opened).ok_value == (
+        [
+            "The [drawer] is closed",
+        ],
+        [
+            "The [drawer] is open",
+            "The [drawer] contains a [key]",
+            "The [key] can be described as 'a gold key'",
+        ],
+    )
+
+    assert room.diff(99).err_value == "unknown checkpoint 99"
+
+#------------------------------------------------------------------------------
+
+def test_fingerprint_follows_the_facts():
+
+    room  = Room.load("data/room1.json")
+    other = Room.load("data/room1.json")
+    start = room.fingerprint()
+
+    assert other.fingerprint() == start
+    assert room.fingerprint() is start
+
+    room.execute(Command.Open(target="drawer"))
+    opened = room.fingerprint()
+    assert opened != start
+
+    room.execute(Command.Close(target="drawer"))
+    assert room.fingerprint() == start
+
+    other.execute(Command.Open(target="drawer"))
+    assert other.fingerprint() == opened
+
+#------------------------------------------------------------------------------
+
+def test_fork_and_merge():
+
+    room  = Room.load("data/room1.json")
+    other = Room.load("data/room1.json")
+    room.execute(Command.Open(target="drawer"))
+    other.execute(Command.Open(target="drawer"))
+    start = room.checkpoint()
+    before = room.facts()
+
+    fork = room.fork()
+    result = fork.execute(Command.Take(target="key"))
+    assert result.ok_value == Event.Taken(target="key")
+    assert fork.inventory == ["key"]
+    assert room.inventory == []                            # the room is untouched
+    assert room.facts() is before
+    assert room.item("drawer") is not fork.item("drawer")
+
+    assert room.merge(fork).ok_value == [Event.Taken(target="key")]
+    other.execute(Command.Take(target="key"))
+    assert room.facts() is fork.facts()                    # precomputed in the fork
+    assert room.facts() == other.facts()
+    assert room.inventory == ["key"]
+    assert room.events == other.events
+    assert "The [player] has a [key]" in room.diff(start).ok_value[0]
+
+    assert room.merge(fork).err_value == "the room has changed since it was forked"    # only once
+
+def test_stale_forks_are_not_merged():
+
+    room = Room.load("data/room1.json")
+    fork = room.fork()
+    fork.execute(Command.Open(target="drawer"))
+    room.execute(Command.Open(target="drawer"))
+
+    assert room.merge(fork).err_value == "the room has changed since it was forked"
+    assert room.events == [Event.Opened(target="drawer")]
+    assert room.merge(Room.load("data/room1.json").fork()).is_err()
+
+#------------------------------------------------------------------------------
+
+def test_only_reachable_items_can_be_used():
+
+    room = Room.load("data/room1.json")
+
+    assert room.reachable("room")   == True
+    assert room.reachable("drawer") == True
+    assert room.reachable("key")    == False
+    assert room.reachable("attic")  == False
+
+    result = room.execute(Command.Take(target="key"))
+    assert result.is_err()
+    assert result.err_value == "[key] is not visible"
+    assert room.version == 0
+
+    result = room.execute(Command.Open(target="attic"))
+    assert result.err_value == "[attic] is not visible"
+
+    room.execute(Command.Open(target="drawer"))
+    assert room.reachable("key") == True
+
+    room.execute(Command.Close(target="drawer"))
+    assert room.reachable("key") == False
+
+    room.execute(Command.Open(target="drawer"))
+    room.execute(Command.Take(target="key"))
+    room.execute(Command.Close(target="drawer"))
+    assert room.reachable("key") == True
+
+    facts = room.facts()
+    result = room.execute(Command.Open(target="door"))
+    assert result.err_value == "[door] is locked"
+    assert room.facts() is facts
+
+#------------------------------------------------------------------------------
+
+def test_stream():
+
+    room = Room.load("data/room1.json")
+
+    assert list(room.stream()) == room.facts()
+
+    assert list(room.stream(max_depth=0)) == [
+        "The [room] can be described as 'a dusty study'",
+        "The [room] has a [desk]",
+        "The [room] has a [floor]",
+        "The [room] has a [door]",
+    ]
+
+    assert list(room.stream(max_facts=2)) == [
+        "The [room] can be described as 'a dusty study'",
+        "The [room] has a [desk]",
+    ]
+
+    assert list(room.stream(max_tokens=30)) == [
+        "The [room] can be described as 'a dusty study'",
+        "The [room] has a [desk]",
+    ]
+
+#------------------------------------------------------------------------------
+
+def test_deeply_nested_facts():
+
+    depth = 5000
+    room = Room.from_json({
+        "name": "Boxes",
+        "description": "boxes in boxes",
+        "items": [{"name": f"box{i}", "description": "a box", "traits": ["container"]} for i in range(depth)],
+        "relationships": [{"source": "room", "relationship": "contains", "target": "box0"}] +
+                         [{"source": f"box{i}", "relationship": "contains", "target": f"box{i+1}"} for i in range(depth - 1)],
+    })
+
+    facts = room.facts()
+    assert len(facts) == 3 * depth + 2
+    assert facts[-1] == "The [box4999] is empty"
+    assert list(room.stream()) == facts
+
+    room.execute(Command.Take(target="box4999"))
+    assert room.facts()[-1] == "The [box4999] is empty"
+
+#------------------------------------------------------------------------------
+
+def test_changes_to_taken_items_reach_the_room():
+
+    with open("data/room1.json") as file:
+        data = json.load(file)
+    for item in data["items"]:
+        if item["name"] == "drawer":
+            item["traits"].append("takeable")    # a box you can carry around
+
+    room = Room.from_json(data)
+    assert room.execute(Command.Open(target="drawer")).is_ok()
+    assert room.execute(Command.Take(target="drawer")).is_ok()
+    assert "The [drawer] is open" in room.facts()
+    checkpoint = room.checkpoint()
+    fingerprint = room.fingerprint()
+
+    assert room.execute(Command.Close(target="drawer")).is_ok()
+    assert "The [drawer] is closed" in room.facts()
+    assert room.facts() == list(room.stream())
+    added, removed = room.diff(checkpoint).unwrap()
+    assert added == ["The [drawer] is closed"]
+    assert "The [drawer] is open" in removed
+    assert room.fingerprint() != fingerprint
+
+#------------------------------------------------------------------------------
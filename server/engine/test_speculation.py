@@ -0,0 +1,70 @@
+import pytest
+from .command import Command
+from .event import Event
+from .room import Room
+from .speculation import Speculator
+
+#------------------------------------------------------------------------------
+
+def test_speculation_is_committed_when_the_command_matches():
+
+    room = Room.load("data/room1.json")
+    speculator = Speculator()
+    before = room.facts()
+
+    result = speculator.speculate(room, Command.Open(target="drawer"))
+    assert result.ok_value == Event.Opened(target="drawer")
+    assert room.facts() is before
+    assert room.events == []
+
+    fork = speculator.current.fork
+    assert speculator.speculate(room, Command.Open(target="drawer")) is result    # the same interim again
+
+    assert speculator.commit(room, Command.Open(target="drawer")) is result
+    assert room.events == [Event.Opened(target="drawer")]
+    assert room.facts() is fork.facts()
+    assert speculator.current is None
+    assert (speculator.hits, speculator.misses) == (1, 0)
+
+def test_speculation_is_discarded_when_the_command_differs():
+
+    room = Room.load("data/room1.json")
+    speculator = Speculator()
+
+    speculator.speculate(room, Command.Open(target="drawer"))
+    speculator.speculate(room, Command.Open(target="door"))                       # the user kept talking
+    assert speculator.current.command == Command.Open(target="door")
+
+    result = speculator.commit(room, Command.Close(target="drawer"))
+    assert result.is_err()
+    assert room.events == []
+    assert (speculator.hits, speculator.misses) == (0, 1)
+
+def test_speculation_is_discarded_when_the_room_changes():
+
+    room = Room.load("data/room1.json")
+    speculator = Speculator()
+
+    speculator.speculate(room, Command.Open(target="drawer"))
+    room.execute(Command.Open(target="drawer"))                                    # changed underneath it
+
+    result = speculator.commit(room, Command.Open(target="drawer"))
+    assert result.err_value == "[drawer] is already open"
+    assert room.events == [Event.Opened(target="drawer")]
+    assert (speculator.hits, speculator.misses) == (0, 1)
+
+    assert speculator.speculate(room, Command.Take(target="key")).ok_value == Event.Taken(target="key")
+    assert speculator.commit(room, Command.Take(target="key")).ok_value == Event.Taken(target="key")
+    assert room.inventory == ["key"]
+    assert speculator.hits == 1
+
+def test_nothing_to_speculate():
+
+    room = Room.load("data/room1.json")
+    speculator = Speculator()
+
+    assert speculator.speculate(room, None) is None
+    assert speculator.speculate(room, Command.Unlock(target="door", using="key")) is None
+    assert speculator.current is None
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,121 @@
+import time
+import pytest
+from contextlib import closing
+from .store import Store
+from .game import Game
+from .journal import Journal
+from .command import Command
+from .event import Event
+
+#------------------------------------------------------------------------------
+
+def test_store_journals(tmp_path):
+
+    store = Store(tmp_path / "sessions.db")
+    assert store.location("alice") is None
+    assert store.journals("alice") == {}
+
+    journal = Journal(every=2)
+    journal.sink = store.sink("alice", "study")
+    journal.append(Event.Opened(target="drawer"))
+
+    store.locate("alice", "study")
+    assert store.location("alice") == "study"
+
+    journals = store.journals("alice")
+    assert list(journals) == ["study"]
+    assert journals["study"].events == [Event.Opened(target="drawer")]
+
+    journal.append(Event.Taken(target="key"))
+    journal.compact(b"snapshot")
+    journal.append(Event.Closed(target="drawer"))
+
+    stored = store.journals("alice")["study"]
+    assert stored.every    == 2
+    assert stored.base     == 2
+    assert stored.snapshot == b"snapshot"
+    assert stored.events   == [Event.Closed(target="drawer")]
+    assert len(stored)     == 3
+
+    assert store.journals("bob") == {}
+    store.close()
+
+#------------------------------------------------------------------------------
+
+def test_games_resume_from_the_store(tmp_path):
+
+    store = Store(tmp_path / "sessions.db")
+    game = Game.load("data/example.json").persist(store, "alice")
+    game.room.execute(Command.Open(target="drawer"))
+    game.room.execute(Command.Take(target="key"))
+    game.go("north")
+    store.close()
+
+    store = Store(tmp_path / "sessions.db")
+    game = Game.load("data/example.json").persist(store, "alice")
+    assert game.location == "hall"
+    study = game.get("study")
+    assert study.events == [Event.Opened(target="drawer"), Event.Taken(target="key")]
+    assert "key" in study.inventory
+
+    study.execute(Command.Close(target="drawer"))
+    assert len(store.journals("alice")["study"]) == 3
+
+    fresh = Game.load("data/example.json").persist(store, "bob")
+    assert fresh.location == "study"
+    assert fresh.room.events == []
+    store.close()
+
+#------------------------------------------------------------------------------
+
+def test_old_sessions_expire(tmp_path):
+
+    store = Store(tmp_path / "sessions.db")
+    for session in ("alice", "bob"):
+        journal = Journal()
+        journal.sink = store.sink(session, "study")
+        journal.append(Event.Opened(target="drawer"))
+        journal.compact(b"snapshot")
+        store.locate(session, "study")
+    store.flush()
+
+    with closing(store.connect()) as connection:
+        connection.execute("UPDATE sessions SET updated = 0 WHERE session = 'alice'")
+        connection.commit()
+
+    store.expire(24 * 60 * 60)
+    assert store.location("alice") is None
+    assert store.journals("alice") == {}
+    assert store.location("bob") == "study"
+    assert store.journals("bob")["study"].snapshot == b"snapshot"
+    store.close()
+
+#------------------------------------------------------------------------------
+
+def test_the_writer_survives_a_locked_database(tmp_path):
+
+    store = Store(tmp_path / "sessions.db", timeout=0.05, retries=3)
+    other = store.connect()
+    other.execute("BEGIN IMMEDIATE")                           # another worker holding the lock
+    store.locate("alice", "study")
+    time.sleep(0.1)
+    other.rollback()                                           # released before the retries run out
+    assert store.location("alice") == "study"
+    assert store.errors == 0
+
+    journal = Journal()
+    journal.sink = store.sink("alice", "study")
+    journal.append(lambda: None)                               # cannot be stored
+    store.locate("alice", "hall")
+    assert store.location("alice") == "study"                  # the batch was dropped ...
+    assert store.errors == 1
+
+    store.locate("alice", "hall")
+    assert store.location("alice") == "hall"                   # ... but the writer carries on
+    other.close()
+    store.close()
+
+    with pytest.raises(RuntimeError):
+        store.flush()
+
+#------------------------------------------------------------------------------
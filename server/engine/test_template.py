@@ -0,0 +1,36 @@
+import os
+import shutil
+import pytest
+from .template import Template
+
+#------------------------------------------------------------------------------
+
+def test_load_is_cached():
+
+    first  = Template.load("data/room1.json")
+    second = Template.load("data/room1.json")
+
+    assert first is second
+    assert first.name == "The First Room"
+    assert sorted(first.names()) == ["desk", "door", "drawer", "floor", "key", "room"]
+    assert first.graph.name(first.graph.parent(first.graph.id("key"))[0]) == "drawer"
+
+    with pytest.raises(TypeError):
+        first.items["desk"] = None
+
+#------------------------------------------------------------------------------
+
+def test_load_reparses_a_modified_file(tmp_path):
+
+    filename = tmp_path / "room.json"
+    shutil.copy("data/room1.json", filename)
+
+    first = Template.load(filename)
+    stat  = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = Template.load(filename)
+
+    assert first is not second
+    assert first.facts() == second.facts()
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import pytest
+from .relationship import Relationship
+from .template import Template
+from .worldfile import WorldFile, MappedItems
+
+#------------------------------------------------------------------------------
+
+@pytest.fixture
+def source(tmp_path):
+    filename = tmp_path / "room.json"
+    shutil.copy("data/room1.json", filename)
+    return str(filename)
+
+def compile_world(source):
+    with open(source) as file:
+        template = Template.from_json(json.load(file))
+    return template.compile(WorldFile.path(source), source_mtime=os.stat(source).st_mtime_ns)
+
+#------------------------------------------------------------------------------
+
+def test_compiled_world_matches_json(source):
+
+    expected = Template.load(source)
+    compile_world(source)
+
+    world = WorldFile.open(WorldFile.path(source))
+    assert world.name        == "The First Room"
+    assert world.description == "a dusty study"
+    assert sorted(world.items) == sorted(expected.names())
+
+    drawer = world.items["drawer"]
+    assert drawer.traits == expected.item("drawer").traits
+    assert world.items.get("missing") is None
+
+    graph = world.graph
+    key   = graph.id("key")
+    assert graph.name(key) == "key"
+    assert graph.parent(key) == (graph.id("drawer"), Relationship.Kind.CONTAINS)
+    assert graph.parent(graph.id("room")) is None
+    assert [graph.name(c) for c in graph.children(graph.id("room"), Relationship.Kind.HAS)] == ["desk", "floor", "door"]
+    assert graph.id("missing") is None
+
+#------------------------------------------------------------------------------
+
+def test_load_prefers_a_fresh_compiled_world(source):
+
+    compile_world(source)
+    Template._cache.clear()
+
+    template = Template.load(source)
+    assert isinstance(template.items, MappedItems)
+    assert template.facts() == Template.from_json(json.load(open(source))).facts()
+
+#------------------------------------------------------------------------------
+
+def test_load_falls_back_to_json_when_stale(source):
+
+    compile_world(source)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    template = Template.load(source)
+    assert not isinstance(template.items, MappedItems)
+
+#------------------------------------------------------------------------------
+
+def test_load_falls_back_to_json_when_corrupt(source):
+
+    target = compile_world(source)
+    with open(target, "rb") as file:
+        data = file.read()
+    expected = Template.from_json(json.load(open(source))).facts()
+    mtime = os.stat(source).st_mtime_ns
+
+    records = bytearray(data)
+    records[WorldFile.HEADER.size + 4 * 3] ^= 0xFF              # a string index in the first item record, say
+
+    for broken in [b"", data[:10], data[:WorldFile.HEADER.size + 6], data[:len(data) // 2], data[:-1], bytes(records)]:
+        with open(target, "wb") as file:
+            file.write(broken)
+        assert WorldFile.open(target, source_mtime=mtime) is None
+        Template._cache.clear()
+        template = Template.load(source)
+        assert not isinstance(template.items, MappedItems)
+        assert template.facts() == expected
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,15 @@
+import re
+
+#------------------------------------------------------------------------------
+# a cheap approximation of how many LLM tokens a piece of text will cost,
+# words and punctuation marks are counted as one token each, which is close
+# enough to BPE counts for short english facts to budget a prompt with
+#------------------------------------------------------------------------------
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def count(text):
+    return len(TOKEN.findall(text))
+
+def total(texts):
+    return sum(count(text) for text in texts)
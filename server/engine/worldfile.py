@@ -0,0 +1,288 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+from array import array
+from collections.abc import Mapping, Sequence
+
+from .graph import Graph
+from .item import Item
+
+#------------------------------------------------------------------------------
+# A compiled world file (.world) is a precompiled Template that can be
+# memory-mapped instead of parsed, so worker processes share its pages and
+# large worlds open without being parsed. Items are decoded lazily on first
+# use, and the Graph arrays are used in place. Item ids are their position in
+# the items section. The header carries a checksum of everything after it, so
+# a corrupt file is rejected when it is opened rather than when it is used.
+#
+#   header      magic, version, kind count, source mtime, counts, room name/description, checksum
+#   strings     u32 offsets into the blob, one entry per interned string (+1)
+#   items       u32 (name, description, traits) per item, sorted by utf-8 name
+#   adjacency   u32 CSR offsets + u32 targets, one pair per Relationship.Kind
+#   parents     u32 parent id per item, or NONE
+#   kinds       u32 Relationship.Kind index of the relationship to the parent
+#   blob        utf-8 bytes for every interned string
+#
+# Every u32 section is stored as a u32 count followed by that many values.
+#------------------------------------------------------------------------------
+
+class WorldFile:
+
+    MAGIC     = b"PCCW"
+    VERSION   = 3
+    EXTENSION = ".world"
+    NONE      = Graph.NONE
+    HEADER    = struct.Struct("<4sHHqIIII16s")
+    KINDS     = Graph.KINDS
+
+    def __init__(self, buffer, header, view, sections, blob):
+        _, _, _, _, _, self.count, name, description, _ = header
+        self.buffer = buffer
+        self.view = view
+        self.strings   = sections[0]
+        self.records   = sections[1]
+        self.blob      = blob
+        self.name        = self.string(name)
+        self.description = self.string(description)
+        self.items = MappedItems(self)
+        self.graph = Graph(
+            names=MappedNames(self),
+            index=MappedIndex(self),
+            adjacency={kind: (sections[2 + 2*k], sections[3 + 2*k]) for k, kind in enumerate(WorldFile.KINDS)},
+            parents=sections[-2],
+            kinds=sections[-1],
+        )
+
+    #--------------------------------------------------------------------------
+
+    def string(self, index):
+        if index == WorldFile.NONE:
+            return None
+        return self.raw(index).decode("utf-8")
+
+    def raw(self, index):
+        return self.buffer[self.blob + self.strings[index]:self.blob + self.strings[index + 1]]
+
+    def find(self, name):
+        key = name.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self.raw(self.records[3 * mid])
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def name_of(self, index):
+        return sys.intern(self.string(self.records[3 * index]))
+
+    def item(self, index):
+        return Item(
+            name=self.name_of(index),
+            description=self.string(self.records[3 * index + 1]),
+            traits=Item.Trait(self.records[3 * index + 2]),
+        )
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def path(source):
+        return os.path.splitext(source)[0] + WorldFile.EXTENSION
+
+    @staticmethod
+    def is_compiled(path):
+        return os.path.splitext(path)[1] == WorldFile.EXTENSION
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def open(path, source_mtime = None):
+        if sys.byteorder != "little" or array("I").itemsize != 4:
+            return None
+        # anything missing, stale, truncated or corrupt returns None, so that
+        # the caller falls back to the json source
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size < WorldFile.HEADER.size:
+                    return None
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        header = WorldFile.HEADER.unpack_from(buffer, 0)
+        magic, version, kinds, mtime = header[:4]
+        if magic != WorldFile.MAGIC or version != WorldFile.VERSION or kinds != len(WorldFile.KINDS):
+            buffer.close()
+            return None
+        if source_mtime is not None and mtime != source_mtime:
+            buffer.close()
+            return None
+        with memoryview(buffer) as view, view[WorldFile.HEADER.size:] as body:
+            valid = WorldFile.checksum(body) == header[-1]
+        if not valid:
+            buffer.close()
+            return None
+        view = memoryview(buffer)
+        layout = WorldFile.layout(view, header)
+        if layout is None:
+            view.release()
+            buffer.close()
+            return None
+        return WorldFile(buffer, header, view, *layout)
+
+    @staticmethod
+    def layout(view, header):
+        # the u32 sections and the offset of the blob, or None if they do not
+        # fit in the file or do not agree with the header
+        _, _, _, _, strings, count, _, _, _ = header
+        expected = [strings, 3 * count] + [count + 1, None] * len(WorldFile.KINDS) + [count, count]
+        offset = WorldFile.HEADER.size
+        sections = []
+        for length in expected:
+            if offset + 4 > len(view):
+                return None
+            found, = struct.unpack_from("<I", view, offset)
+            offset += 4
+            if (length is not None and found != length) or offset + 4 * found > len(view):
+                return None
+            sections.append(view[offset:offset + 4 * found].cast("I"))
+            offset += 4 * found
+        if strings == 0 or offset + sections[0][-1] > len(view):
+            return None
+        return sections, offset
+
+    @staticmethod
+    def checksum(*chunks):
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in chunks:
+            digest.update(chunk)
+        return digest.digest()
+
+    #--------------------------------------------------------------------------
+
+    @staticmethod
+    def compile(template, target, source_mtime = 0):
+        strings = {}
+        def intern(value):
+            if value is None:
+                return WorldFile.NONE
+            return strings.setdefault(value, len(strings))
+
+        room        = intern(template.name)
+        description = intern(template.description)
+
+        graph = template.graph
+        names = sorted(template.names(), key=lambda name: name.encode("utf-8"))
+        ids   = [graph.id(name) for name in names]
+        index = {id: i for i, id in enumerate(ids)}
+
+        records = array("I")
+        for name in names:
+            item = template.item(name)
+            records.extend([intern(item.name), intern(item.description), int(item.traits)])
+
+        sections = [None, records]
+        for kind in WorldFile.KINDS:
+            sections.extend(Graph.csr([[index[child] for child in graph.children(id, kind)] for id in ids]))
+
+        parents = array("I")
+        kinds   = array("I")
+        for id in ids:
+            found = graph.parent(id)
+            parents.append(WorldFile.NONE if found is None else index[found[0]])
+            kinds.append(0 if found is None else WorldFile.KINDS.index(found[1]))
+        sections.extend([parents, kinds])
+
+        blob = bytearray()
+        offsets = array("I")
+        for value in strings:
+            offsets.append(len(blob))
+            blob.extend(value.encode("utf-8"))
+        offsets.append(len(blob))
+        sections[0] = offsets
+
+        chunks = []
+        for section in sections:
+            if sys.byteorder != "little":
+                section.byteswap()
+            chunks.extend([struct.pack("<I", len(section)), section.tobytes()])
+        chunks.append(blob)
+
+        header = WorldFile.HEADER.pack(
+            WorldFile.MAGIC,
+            WorldFile.VERSION,
+            len(WorldFile.KINDS),
+            source_mtime,
+            len(strings) + 1,
+            len(names),
+            room,
+            description,
+            WorldFile.checksum(*chunks),
+        )
+
+        partial = f"{target}.tmp"
+        with open(partial, "wb") as file:
+            file.write(header)
+            file.writelines(chunks)
+        os.replace(partial, target)
+        return target
+
+#------------------------------------------------------------------------------
+
+class MappedItems(Mapping):
+    def __init__(self, world):
+        self._world = world
+        self._decoded = {}
+
+    def __getitem__(self, name):
+        item = self._decoded.get(name)
+        if item is None:
+            index = self._world.find(name)
+            if index is None:
+                raise KeyError(name)
+            item = self._decoded[name] = self._world.item(index)
+        return item
+
+    def __iter__(self):
+        return (self._world.name_of(i) for i in range(self._world.count))
+
+    def __len__(self):
+        return self._world.count
+
+#------------------------------------------------------------------------------
+
+class MappedNames(Sequence):
+    def __init__(self, world):
+        self._world = world
+
+    def __getitem__(self, id):
+        return self._world.name_of(id)
+
+    def __len__(self):
+        return self._world.count
+
+#------------------------------------------------------------------------------
+
+class MappedIndex(Mapping):
+    def __init__(self, world):
+        self._world = world
+
+    def __getitem__(self, name):
+        id = self._world.find(name)
+        if id is None:
+            raise KeyError(name)
+        return id
+
+    def __iter__(self):
+        return iter(MappedNames(self._world))
+
+    def __len__(self):
+        return self._world.count
+
+#------------------------------------------------------------------------------
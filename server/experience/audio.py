@@ -0,0 +1,95 @@
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+#------------------------------------------------------------------------------
+# An AudioCache keeps synthesized speech for lines that are spoken over and
+# over, keyed by (text, voice, model), as raw PCM files on local disk with an
+# in-memory LRU (bounded by bytes) in front of them. Each file is an 8 byte
+# header (u32 sample rate, u32 channels) followed by the PCM samples. It is
+# safe to share between threads (sessions read it with asyncio.to_thread).
+#------------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class Audio:
+    pcm: bytes
+    sample_rate: int
+    channels: int
+
+class AudioCache:
+
+    CAPACITY  = 64 * 1024 * 1024
+    HEADER    = struct.Struct("<II")
+    EXTENSION = ".pcm"
+
+    def __init__(self, directory, capacity = CAPACITY):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.capacity = capacity
+        self.size = 0
+        self.memory = OrderedDict()   # key -> Audio, least recently used first
+        self.lock = threading.Lock()  # guards memory and size
+
+    @staticmethod
+    def key(text, voice, model):
+        return hashlib.sha256("\0".join([text, voice, model]).encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + AudioCache.EXTENSION)
+
+    #--------------------------------------------------------------------------
+
+    def get(self, key):
+        with self.lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.memory.move_to_end(key)
+                return audio
+        try:
+            with open(self.path(key), "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < AudioCache.HEADER.size:
+            return None
+        sample_rate, channels = AudioCache.HEADER.unpack_from(data)
+        audio = Audio(data[AudioCache.HEADER.size:], sample_rate, channels)
+        self.remember(key, audio)
+        return audio
+
+    def contains(self, key):
+        with self.lock:
+            if key in self.memory:
+                return True
+        return os.path.exists(self.path(key))
+
+    def put(self, key, audio):
+        # written to a file of its own first, so writers never race on it
+        descriptor, partial = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(AudioCache.HEADER.pack(audio.sample_rate, audio.channels))
+                file.write(audio.pcm)
+            os.replace(partial, self.path(key))
+        except BaseException:
+            os.unlink(partial)
+            raise
+        self.remember(key, audio)
+
+    def remember(self, key, audio):
+        with self.lock:
+            previous = self.memory.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.pcm)
+            self.memory[key] = audio
+            self.size += len(audio.pcm)
+            while self.size > self.capacity and len(self.memory) > 1:
+                _, evicted = self.memory.popitem(last=False)
+                self.size -= len(evicted.pcm)
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,67 @@
+import time
+
+from collections import OrderedDict
+
+from engine.parser import Parser
+
+#------------------------------------------------------------------------------
+# A ResponseCache remembers what the LLM said in reply to an utterance in a
+# given world state, keyed on Room.fingerprint() and the normalized utterance,
+# so "look around" in an unchanged room can be answered without the LLM.
+# Entries expire after [ttl] seconds and the least recently used are evicted
+# beyond [capacity]. Hits and misses are counted in an optional Counter.
+#------------------------------------------------------------------------------
+
+FILLER = {"um", "uh", "er", "erm", "hmm", "please", "ok", "okay", "so", "well", "like"}
+
+def normalize(utterance):
+    return " ".join(word for word in Parser.words(utterance) if not word in FILLER)
+
+class ResponseCache:
+
+    CAPACITY = 1024
+    TTL      = 600.0
+
+    def __init__(self, capacity = CAPACITY, ttl = TTL, counter = None, clock = time.monotonic):
+        assert capacity > 0
+        self.capacity = capacity
+        self.ttl = ttl
+        self.counter = counter
+        self.clock = clock
+        self.entries = OrderedDict()   # key -> (expires, response), least recently used first
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(fingerprint, utterance):
+        utterance = normalize(utterance)
+        if not utterance:
+            return None
+        return (fingerprint, utterance)
+
+    #--------------------------------------------------------------------------
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.count("miss")
+            return None
+        self.entries.move_to_end(key)
+        self.count("hit")
+        return entry[1]
+
+    def put(self, key, response):
+        self.entries[key] = (self.clock() + self.ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def count(self, result):
+        if self.counter is not None:
+            self.counter.inc(result)
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,134 @@
+import asyncio
+import functools
+
+from engine import tokens
+
+#------------------------------------------------------------------------------
+# A ContextBudget keeps the prompt sent to the LLM within a token budget, so
+# time to first token stays flat however long a session goes on. When the
+# messages grow past [budget] they are trimmed down to a fraction of it:
+#
+#   * the system prompt (the first message) is always kept
+#   * every later system message (the world, changes to it, one-off
+#     instructions) is replaced by a fresh description of the world, within
+#     a [WORLD] share of the budget (see Room.stream)
+#   * the oldest turns are dropped, but never the [keep] most recent ones,
+#     and are replaced by a single summary message
+#
+# Trimming is cheap and happens on the critical path, summarizing does not.
+# The dropped turns are summarized by a background task (see summarizing),
+# which updates the summary message in place once it is done, so a slow
+# summarizer (another LLM, say) never delays a turn.
+#------------------------------------------------------------------------------
+
+class ContextBudget:
+
+    BUDGET  = 1500    # tokens the prompt may grow to before it is trimmed
+    TARGET  = 0.75    # fraction of the budget it is trimmed down to
+    KEEP    = 6       # most recent turns that are never trimmed
+    SUMMARY = 250     # tokens the summary of older turns may take
+    WORLD   = 0.4     # fraction of the budget the description of the world may take
+
+    PLACEHOLDER = "Some earlier turns of the conversation have been left out."
+
+    def __init__(self, world, budget = BUDGET, keep = KEEP, summary = SUMMARY, summarize = None, count = tokens.count):
+        self.world = world            # (max tokens) -> a description of the world as it is now
+        self.budget = budget
+        self.keep = keep
+        self.limit = summary
+        self.summarize = summarize or recap    # async (summary, turns, limit) -> summary
+        self.count = functools.lru_cache(maxsize=1024)(count)    # most messages are counted every turn
+        self.summary = ""
+        self.message = None           # the summary message, once anything has been trimmed
+        self.backlog = []             # trimmed turns waiting to be summarized
+        self.pending = None           # the task summarizing them
+        self.trimmed = 0
+        self.errors = 0
+
+    def size(self, messages):
+        return sum(self.cost(message) for message in messages)
+
+    def cost(self, message):
+        content = message.get("content")
+        return self.count(content) if isinstance(content, str) else 0
+
+    #--------------------------------------------------------------------------
+
+    def fit(self, messages):
+        # the messages to send instead, or None if [messages] are within budget
+        if self.size(messages) <= self.budget:
+            return None
+
+        if self.message is None:
+            self.message = {"role": "system", "content": ContextBudget.PLACEHOLDER}
+
+        head = [
+            messages[0],
+            {"role": "system", "content": self.world(self.share())},
+        ]
+        turns = [m for m in messages[1:] if m["role"] != "system"]
+
+        target = int(self.budget * ContextBudget.TARGET)
+        size = self.size(head) + max(self.cost(self.message), self.limit) + self.size(turns)    # room for the summary to come
+        cut = 0
+        while cut < len(turns) - self.keep and size > target:
+            size -= self.cost(turns[cut])
+            cut += 1
+
+        self.backlog.extend(turns[:cut])
+        self.trimmed += cut
+        if self.trimmed:
+            head.append(self.message)
+        return head + turns[cut:]
+
+    def share(self):
+        # the tokens the description of the world may take
+        return int(self.budget * ContextBudget.WORLD)
+
+    def summarizing(self):
+        # summarizes the turns trimmed so far in the background
+        if self.backlog and (self.pending is None or self.pending.done()):
+            self.pending = asyncio.create_task(self._summarize())
+        return self.pending
+
+    async def _summarize(self):
+        while self.backlog:
+            turns, self.backlog = self.backlog, []
+            try:
+                self.summary = await self.summarize(self.summary, turns, self.limit)
+            except Exception:
+                self.errors += 1    # the turns are simply dropped
+                continue
+            self.message["content"] = f"Earlier in the conversation:\n{self.summary}"
+
+    async def close(self):
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+#------------------------------------------------------------------------------
+# the default summarizer needs no LLM, it keeps the most recent lines of the
+# conversation that fit within [limit] tokens
+#------------------------------------------------------------------------------
+
+SPEAKERS = {
+    "user":      "The player",
+    "assistant": "You",
+}
+
+async def recap(summary, turns, limit, count = tokens.count):
+    lines = summary.splitlines() if summary else []
+    for turn in turns:
+        content = turn.get("content")
+        if isinstance(content, str):
+            lines.append(f"- {SPEAKERS.get(turn['role'], turn['role'])} said: {content}")
+
+    kept = []
+    for line in reversed(lines):
+        limit -= count(line)
+        if limit < 0:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
+
+#------------------------------------------------------------------------------
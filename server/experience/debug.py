@@ -0,0 +1,86 @@
+import asyncio
+
+from collections import deque
+from enum import IntEnum
+
+#------------------------------------------------------------------------------
+# A DebugChannel coalesces trace records into batches that are sent to the
+# client every [interval] seconds, or as soon as [batch] records are waiting,
+# so debug traffic is a handful of small transport messages instead of one per
+# frame. Records wait in a bounded queue that drops the oldest when full, so a
+# slow client costs dropped records (reported with the next batch) and never
+# memory or delayed audio. The client chooses how much it wants with [level].
+#------------------------------------------------------------------------------
+
+class DebugChannel:
+
+    class Level(IntEnum):
+        OFF    = 0    # nothing
+        EVENTS = 1    # what the experience did (intents, world changes)
+        FRAMES = 2    # and every frame that moves through the pipeline
+
+        @staticmethod
+        def parse(value):
+            return DebugChannel.Level[value.upper()]
+
+    CAPACITY = 512
+    BATCH    = 64
+    INTERVAL = 0.1
+
+    def __init__(self, send, level = Level.EVENTS, capacity = CAPACITY, batch = BATCH, interval = INTERVAL):
+        self.send = send              # async (records, dropped) -> None
+        self.level = level
+        self.batch = batch
+        self.interval = interval
+        self.records = deque(maxlen=capacity)
+        self.dropped = 0
+        self.sent = 0
+        self._ready = asyncio.Event()
+        self._task = None
+
+    def wants(self, level):
+        return level <= self.level
+
+    def post(self, level, record):
+        if level > self.level:
+            return
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+        self.records.append(record)
+        if len(self.records) >= self.batch:
+            self._ready.set()
+
+    #--------------------------------------------------------------------------
+
+    async def flush(self):
+        while self.records:
+            count = min(self.batch, len(self.records))
+            records = [self.records.popleft() for _ in range(count)]
+            dropped, self.dropped = self.dropped, 0
+            await self.send(records, dropped)
+            self.sent += 1
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,34 @@
+import asyncio
+
+#------------------------------------------------------------------------------
+# a deliberately tiny HTTP/1.0 server for the local endpoints a process
+# exposes (see metrics.serve and supervisor.serve), [routes] maps a (method,
+# path) to a function(body) -> (status, content type, bytes)
+#------------------------------------------------------------------------------
+
+NOT_FOUND = ("404 Not Found", "text/plain; charset=utf-8", b"not found\n")
+
+async def listen(routes, host, port):
+
+    async def handle(reader, writer):
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            length = 0
+            while (line := (await reader.readline()).strip()):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            body = await reader.readexactly(length) if length else b""
+            method, path = (request + ["", ""])[:2]
+            route = routes.get((method, path.split("?")[0]))
+            status, content_type, data = NOT_FOUND if route is None else route(body)
+            writer.write(
+                f"HTTP/1.0 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+#------------------------------------------------------------------------------
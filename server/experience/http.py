@@ -0,0 +1,76 @@
+import time
+
+import aiohttp
+
+#------------------------------------------------------------------------------
+# An HTTPPool is the one aiohttp.ClientSession that every session in the
+# process shares (the smart turn analyzer, audio pre-rendering, ...), so
+# connections, and their DNS, TCP and TLS handshakes, are kept alive and
+# reused across turns and sessions instead of being paid for again by every
+# new connection. When given a metrics Registry it counts how often
+# connections are created versus reused, and how long creating them takes.
+#------------------------------------------------------------------------------
+
+class HTTPPool:
+
+    LIMIT          = 100     # connections in total
+    LIMIT_PER_HOST = 16      # connections to any one host
+    KEEPALIVE      = 30.0    # seconds an idle connection is kept open
+    DNS_TTL        = 300     # seconds a resolved host is cached
+
+    def __init__(self, limit = LIMIT, limit_per_host = LIMIT_PER_HOST, keepalive = KEEPALIVE, dns_ttl = DNS_TTL, registry = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.connections = None
+        self.connecting = None
+        if registry is not None:
+            self.connections = registry.counter("pcc_http_connections_total", "Pooled HTTP connections by whether they were created or reused.", "event")
+            self.connecting  = registry.histogram("pcc_http_connect_seconds", "Time to open a new pooled HTTP connection.", "host")
+        self._session = None
+
+    def session(self):
+        # created on first use, since a ClientSession belongs to the running loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self.tracing()])
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    #--------------------------------------------------------------------------
+
+    def tracing(self):
+        config = aiohttp.TraceConfig()
+
+        async def request_start(session, context, params):
+            context.host = params.url.host
+
+        async def create_start(session, context, params):
+            context.start = time.perf_counter()
+
+        async def create_end(session, context, params):
+            if self.connections is not None:
+                self.connections.inc("created")
+                self.connecting.observe(context.host, time.perf_counter() - context.start)
+
+        async def reuse(session, context, params):
+            if self.connections is not None:
+                self.connections.inc("reused")
+
+        config.on_request_start.append(request_start)
+        config.on_connection_create_start.append(create_start)
+        config.on_connection_create_end.append(create_end)
+        config.on_connection_reuseconn.append(reuse)
+        return config
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,68 @@
+import argparse
+import subprocess
+import sys
+
+#------------------------------------------------------------------------------
+# profiles what importing a module costs in a fresh interpreter, using
+# python -X importtime, usage:
+#
+#   python -m experience.imports [bot] [--top 25]
+#
+# reports the slowest modules by cumulative time and the slowest top level
+# packages by their own (self) time, which is what a cold start pays before
+# the bot can answer
+#------------------------------------------------------------------------------
+
+def profile(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    return parse(result.stderr)
+
+def parse(output):
+    # [(module, depth, self us, cumulative us)] in the order they finished importing
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return imports
+
+def total(imports, module):
+    return next((cumulative for name, _, _, cumulative in imports if name == module), None)
+
+def packages(imports):
+    # self time per top level package
+    totals = {}
+    for name, _, own, _ in imports:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + own
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+#------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m experience.imports")
+    parser.add_argument("module", nargs="?", default="bot")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    imports = profile(args.module)
+    print(f"import {args.module}: {total(imports, args.module) / 1e3:,.1f}ms, {len(imports)} modules")
+    print()
+    print(f"{'cumulative ms':>14}  module")
+    for name, _, _, cumulative in sorted(imports, key=lambda i: i[3], reverse=True)[:args.top]:
+        print(f"{cumulative / 1e3:>14,.1f}  {name}")
+    print()
+    print(f"{'self ms':>14}  package")
+    for package, own in packages(imports)[:args.top]:
+        print(f"{own / 1e3:>14,.1f}  {package}")
+
+if __name__ == "__main__":
+    main()
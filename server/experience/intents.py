@@ -0,0 +1,57 @@
+from engine.parser import Parser
+
+#------------------------------------------------------------------------------
+# Intents is a table of the things a player can ask for by keyword ("switch
+# to the woman's voice", "debug on"). Every phrase of every registered intent
+# is compiled, once, into a single word trie that each transcript is scanned
+# against in one pass. Phrases only match whole words, so "man" does not match
+# "woman", "command" or "manage", but a phrase also matches its possessive, so
+# "woman" does match "the woman's voice".
+#------------------------------------------------------------------------------
+
+class Intents:
+
+    def __init__(self):
+        self.intents = {}     # name -> (phrases, action)
+        self._trie = None
+
+    def __len__(self):
+        return len(self.intents)
+
+    def register(self, name, phrases, action):
+        self.intents[name] = (tuple(phrases), action)
+        self._trie = None
+
+    def compile(self):
+        if self._trie is None:
+            self._trie = Parser.trie(
+                (variant, name)
+                for name, (phrases, _) in self.intents.items()
+                for phrase in phrases
+                for variant in (phrase, f"{phrase}'s")
+            )
+        return self._trie
+
+    #--------------------------------------------------------------------------
+
+    def match(self, text):
+        # the names of the intents in [text], in the order they were said
+        trie = self.compile()
+        words = Parser.words(text)
+        found = []
+        i = 0
+        while i < len(words):
+            names, end = Parser.scan(trie, words, i)
+            if names is None:
+                i += 1
+                continue
+            for name in sorted(names):
+                if not name in found:
+                    found.append(name)
+            i = end
+        return found
+
+    def actions(self, text):
+        return [(name, self.intents[name][1]) for name in self.match(text)]
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,67 @@
+import time
+
+from collections import deque
+
+#------------------------------------------------------------------------------
+# TurnLatency timestamps each stage of a conversational turn, as the frames
+# that mark them go by, and records how long every stage took (and the whole
+# turn) in a Histogram labelled by stage. An observer sees the same frame at
+# every hop, so only the first sighting of a frame id counts. A turn starts
+# when the user stops speaking, and each stage is measured from the most
+# recent stage recorded before it, so a missing stage does not drop the rest.
+# A final transcription often arrives before the user is deemed to have
+# stopped (turn detection waits for silence), it is then kept until the turn
+# starts and recorded as taking no time at all.
+#------------------------------------------------------------------------------
+
+class TurnLatency:
+
+    STAGES = (
+        "user-stopped",    # the user stopped speaking, the turn starts
+        "transcribed",     # a final transcription arrived
+        "llm-started",     # the LLM started its response (first token)
+        "tts-started",     # the TTS started producing audio
+        "bot-started",     # the bot started speaking, the turn ends
+    )
+
+    TURN = "turn"
+    SEEN = 64              # frame ids remembered, to ignore their later hops
+
+    def __init__(self, histogram, clock = time.monotonic):
+        self.histogram = histogram
+        self.clock = clock
+        self.marks = None    # stage -> time, for the current turn
+        self.early = None    # when a transcription arrived ahead of its turn
+        self.seen = deque(maxlen=TurnLatency.SEEN)
+
+    def mark(self, stage, now = None, id = None):
+        if id is not None:
+            if id in self.seen:
+                return
+            self.seen.append(id)
+        now = self.clock() if now is None else now
+
+        start, transcribed = TurnLatency.STAGES[:2]
+        if stage == start:
+            self.marks = {stage: now}
+            if self.early is not None:
+                self.histogram.observe(transcribed, 0.0)
+                self.marks[transcribed] = now
+                self.early = None
+            return
+        if stage == transcribed and (self.marks is None or stage in self.marks):
+            self.early = now    # for the next turn
+            return
+        if self.marks is None or stage in self.marks:
+            return
+
+        index = TurnLatency.STAGES.index(stage)
+        previous = max(self.marks[s] for s in TurnLatency.STAGES[:index] if s in self.marks)
+        self.histogram.observe(stage, now - previous)
+        self.marks[stage] = now
+
+        if stage == TurnLatency.STAGES[-1]:
+            self.histogram.observe(TurnLatency.TURN, now - self.marks[start])
+            self.marks = None
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,115 @@
+from bisect import bisect_left
+
+from .endpoint import listen
+
+#------------------------------------------------------------------------------
+# A small, process-wide metrics Registry that renders in the Prometheus text
+# format and can be served on a local HTTP endpoint (see serve), so every
+# session in this process is aggregated into the same histograms.
+#------------------------------------------------------------------------------
+
+BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+class Histogram:
+
+    def __init__(self, name, help, label, buckets = BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}    # label value -> [counts per bucket + 1, sum]
+
+    def observe(self, key, value):
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, key):
+        series = self.series.get(key)
+        return 0 if series is None else sum(series[0])
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key in sorted(self.series):
+            counts, total = self.series[key]
+            label = f'{self.label}="{escape(key)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (None,), counts):
+                cumulative += count
+                le = "+Inf" if bound is None else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total!r}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return lines
+
+#------------------------------------------------------------------------------
+
+class Counter:
+
+    def __init__(self, name, help, label):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.series = {}    # label value -> count
+
+    def inc(self, key, amount = 1):
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def value(self, key):
+        return self.series.get(key, 0)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+        ]
+        for key in sorted(self.series):
+            lines.append(f'{self.name}{{{self.label}="{escape(key)}"}} {self.series[key]}')
+        return lines
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+#------------------------------------------------------------------------------
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = {}    # name -> metric
+
+    def histogram(self, name, help, label, buckets = BUCKETS):
+        return self.register(Histogram(name, help, label, buckets))
+
+    def counter(self, name, help, label):
+        return self.register(Counter(name, help, label))
+
+    def register(self, metric):
+        assert not metric.name in self.metrics, f"[{metric.name}] is already registered"
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+#------------------------------------------------------------------------------
+# GET /metrics is all the endpoint has to answer
+#------------------------------------------------------------------------------
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+async def serve(registry = REGISTRY, host = "127.0.0.1", port = 9464):
+    return await listen({
+        ("GET", "/metrics"): lambda body: ("200 OK", CONTENT_TYPE, registry.render().encode("utf-8")),
+    }, host, port)
+
+#------------------------------------------------------------------------------
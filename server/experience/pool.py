@@ -0,0 +1,61 @@
+import asyncio
+
+from collections import deque
+
+#------------------------------------------------------------------------------
+# A WarmPool keeps [size] resources built ahead of time, so a new session can
+# take one immediately instead of paying for its construction. Every acquire
+# starts a background refill, builds run in a worker thread so that the event
+# loop (and every other session's audio) never waits on them, and a resource
+# is only ever handed out once.
+#------------------------------------------------------------------------------
+
+class WarmPool:
+
+    SIZE = 2
+
+    def __init__(self, build, size = SIZE):
+        self.build = build         # () -> resource, may be slow
+        self.size = size
+        self.ready = deque()
+        self.hits = 0
+        self.misses = 0
+        self._filling = None
+
+    def __len__(self):
+        return len(self.ready)
+
+    def prefill(self):
+        # fills the pool synchronously, for before there is an event loop
+        while len(self.ready) < self.size:
+            self.ready.append(self.build())
+
+    async def acquire(self):
+        if self.ready:
+            self.hits += 1
+            resource = self.ready.popleft()
+        else:
+            self.misses += 1
+            resource = await asyncio.to_thread(self.build)
+        self.fill()
+        return resource
+
+    def fill(self):
+        if self._filling is None or self._filling.done():
+            self._filling = asyncio.create_task(self._fill())
+        return self._filling
+
+    async def _fill(self):
+        while len(self.ready) < self.size:
+            self.ready.append(await asyncio.to_thread(self.build))
+
+    async def close(self):
+        if self._filling is not None:
+            self._filling.cancel()
+            try:
+                await self._filling
+            except asyncio.CancelledError:
+                pass
+        self.ready.clear()
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,35 @@
+from engine.event import Event
+from engine.item import Item
+
+#------------------------------------------------------------------------------
+# the fixed lines spoken for events the engine executed itself (see
+# CommandProcessor), since they never change they are also the lines worth
+# pre-rendering to audio (see AudioCache)
+#------------------------------------------------------------------------------
+
+REPLIES = {
+    Event.Opened:   "You open the {target}.",
+    Event.Closed:   "You close the {target}.",
+    Event.Unlocked: "You unlock the {target}.",
+    Event.Taken:    "You take the {target}.",
+}
+
+TRAITS = {    # the events the engine can execute itself, the engine cannot unlock yet
+    Event.Opened:   Item.Trait.OPENABLE,
+    Event.Closed:   Item.Trait.CLOSABLE,
+    Event.Taken:    Item.Trait.TAKEABLE,
+}
+
+def describe_events(events):
+    events = events if isinstance(events, list) else [events]
+    return " ".join(REPLIES[type(event)].format(target=event.target) for event in events)
+
+def lines(template):
+    # every reply that could be spoken for an item in [template]
+    for name in template.names():
+        item = template.item(name)
+        for event, trait in TRAITS.items():
+            if item.has_trait(trait):
+                yield REPLIES[event].format(target=name)
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,33 @@
+import re
+
+#------------------------------------------------------------------------------
+# A StandinLLM answers like a (very dull) narrator without a network round
+# trip, so the pipeline, and anything in front of the LLM like the response
+# cache, can be exercised locally. The reply is a deterministic function of
+# the conversation, and [delay] simulates the LLM's time to first token.
+#------------------------------------------------------------------------------
+
+ITEM = re.compile(r"\[([^\]]+)\]")
+
+class StandinLLM:
+
+    def __init__(self, delay = 0.5):
+        self.delay = delay
+        self.calls = 0
+
+    def reply(self, messages):
+        self.calls += 1
+        said = next((m["content"] for m in reversed(messages) if m["role"] == "user"), None)
+        if said is None:
+            return "Hello, I am a stand-in narrator."
+        items = []
+        for message in messages:
+            if message["role"] == "system":
+                for item in ITEM.findall(message["content"]):
+                    if not item in items:
+                        items.append(item)
+        if items:
+            return f"You said '{said}'. Around you are: {', '.join(items)}."
+        return f"You said '{said}'."
+
+#------------------------------------------------------------------------------
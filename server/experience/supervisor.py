@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+
+from collections import OrderedDict
+
+from .endpoint import listen
+
+#------------------------------------------------------------------------------
+# A Supervisor runs sessions across N worker processes (one per core by
+# default), each with its own asyncio loop, so that a CPU heavy session only
+# adds jitter to the sessions that share its worker. Usage:
+#
+#   python -m experience.supervisor bot:supervised [--workers 4] [--cap 20] [--port 7861]
+#
+#   POST /start   {...}  starts a session, the json is passed to the target
+#   GET  /status         reports every worker
+#
+# Workers report their active sessions and event loop lag every [interval].
+# New sessions go to the least loaded worker below [cap]. A worker that stops
+# reporting for [stuck_after], or whose loop keeps lagging by more than
+# [stuck_lag] for that long, is drained (gets no new sessions). A one-off
+# stall does neither. A draining worker that reports healthy again is put
+# back to work, one that finishes its sessions exits and is restarted, and
+# one that has not reported for [drain_timeout] is stuck for good and is
+# terminated and restarted, all without touching the sessions on any other
+# worker. Each worker process has
+# PCC_WORKER set to its index, for anything that must differ between workers
+# (a port, say). Only the most recent ENDED sessions are remembered in [ended].
+#------------------------------------------------------------------------------
+
+class WorkerState:
+    __slots__ = ("index", "process", "inbox", "sessions", "lag", "seen", "started", "lagging", "draining")
+
+    def __init__(self, index, process = None, inbox = None):
+        self.index = index
+        self.process = process
+        self.inbox = inbox
+        self.sessions = set()
+        self.lag = 0.0
+        self.seen = None        # when it last reported
+        self.started = time.monotonic()
+        self.lagging = None     # since when its reported lag has been too high
+        self.draining = None    # when draining started
+
+    def silent(self, now):
+        # how long since it last showed signs of life
+        return now - (self.started if self.seen is None else self.seen)
+
+    def load(self, lag_per_session):
+        return len(self.sessions) + self.lag / lag_per_session
+
+def least_loaded(workers, cap, lag_per_session):
+    available = [w for w in workers if w.draining is None and len(w.sessions) < cap]
+    if not available:
+        return None
+    return min(available, key=lambda w: (w.load(lag_per_session), w.index))
+
+#------------------------------------------------------------------------------
+
+class Supervisor:
+
+    CAP             = 20      # sessions per worker
+    INTERVAL        = 0.25    # seconds between worker reports
+    LAG_PER_SESSION = 0.01    # seconds of loop lag that count as much as one more session
+    STUCK_LAG       = 1.0     # seconds of loop lag that count as lagging
+    STUCK_AFTER     = 5.0     # seconds lagging, or without a report, before a worker is drained
+    DRAIN_TIMEOUT   = 30.0    # seconds without a report before a worker is terminated
+    ENDED           = 1024    # ended sessions remembered
+
+    def __init__(self, target, workers = None, cap = CAP, interval = INTERVAL, lag_per_session = LAG_PER_SESSION,
+                 stuck_lag = STUCK_LAG, stuck_after = STUCK_AFTER, drain_timeout = DRAIN_TIMEOUT):
+        self.target = target    # "module:function", an async function(payload)
+        self.count = workers or os.cpu_count() or 1
+        self.cap = cap
+        self.interval = interval
+        self.lag_per_session = lag_per_session
+        self.stuck_lag = stuck_lag
+        self.stuck_after = stuck_after
+        self.drain_timeout = drain_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.outbox = self.context.Queue()
+        self.workers = []
+        self.ids = itertools.count(1)
+        self.ended = OrderedDict()    # session id -> error, or None, most recent last
+        self.restarts = 0
+        self.lock = threading.Lock()
+        self.running = False
+        self.monitor = None
+
+    def start(self):
+        self.running = True
+        self.workers = [self.spawn(index) for index in range(self.count)]
+        self.monitor = threading.Thread(target=self.watch, name="supervisor", daemon=True)
+        self.monitor.start()
+        return self
+
+    def stop(self):
+        # the monitor goes first, so that it does not restart workers as they stop
+        self.running = False
+        if self.monitor is not None:
+            self.monitor.join()
+        for worker in self.workers:
+            worker.inbox.put(("stop",))
+        for worker in self.workers:
+            worker.process.join(self.drain_timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def spawn(self, index):
+        inbox = self.context.Queue()
+        process = self.context.Process(
+            target=work,
+            args=(index, self.target, inbox, self.outbox, self.interval),
+            name=f"worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        return WorkerState(index, process, inbox)
+
+    #--------------------------------------------------------------------------
+
+    def assign(self, payload):
+        # the (session id, worker index) the session was started on, or None if every worker is full
+        with self.lock:
+            worker = least_loaded(self.workers, self.cap, self.lag_per_session)
+            if worker is None:
+                return None
+            id = next(self.ids)
+            worker.sessions.add(id)
+            worker.inbox.put(("start", id, payload))
+            return id, worker.index
+
+    def status(self):
+        with self.lock:
+            return [{
+                "worker": w.index,
+                "pid": w.process.pid,
+                "sessions": len(w.sessions),
+                "lag": w.lag,
+                "draining": w.draining is not None,
+            } for w in self.workers]
+
+    #--------------------------------------------------------------------------
+
+    def watch(self):
+        while self.running:
+            try:
+                message = self.outbox.get(timeout=self.interval)
+            except queue.Empty:
+                message = None
+            with self.lock:
+                if message is not None:
+                    self.receive(message)
+                self.check(time.monotonic())
+
+    def receive(self, message):
+        match message:
+            case ("status", index, _, lag):
+                worker = self.workers[index]
+                worker.lag = lag
+                worker.seen = time.monotonic()
+                if lag > self.stuck_lag:
+                    if worker.lagging is None:
+                        worker.lagging = worker.seen
+                else:
+                    worker.lagging = None
+                    if worker.draining is not None:
+                        worker.draining = None    # it recovered
+                        worker.inbox.put(("resume",))
+            case ("ended", index, id, error):
+                self.workers[index].sessions.discard(id)
+                self.end(id, error)
+
+    def end(self, id, error):
+        self.ended[id] = error
+        while len(self.ended) > Supervisor.ENDED:
+            self.ended.popitem(last=False)
+
+    def check(self, now):
+        for worker in self.workers:
+            if not worker.process.is_alive() or worker.silent(now) > self.drain_timeout:
+                self.restart(worker)
+            elif worker.draining is None and self.stuck(worker, now):
+                worker.draining = now
+                worker.inbox.put(("drain",))
+
+    def stuck(self, worker, now):
+        if worker.seen is None:
+            return False    # still importing its target, which can take a while
+        if worker.lagging is not None and now - worker.lagging > self.stuck_after:
+            return True
+        return worker.silent(now) > self.stuck_after
+
+    def restart(self, worker):
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join()
+        for id in worker.sessions:
+            self.end(id, "worker restarted")
+        self.workers[worker.index] = self.spawn(worker.index)
+        self.restarts += 1
+
+#------------------------------------------------------------------------------
+# the worker process
+#------------------------------------------------------------------------------
+
+def resolve(target):
+    module, function = target.split(":")
+    return getattr(importlib.import_module(module), function)
+
+def work(index, target, inbox, outbox, interval):
+    os.environ["PCC_WORKER"] = str(index)
+    asyncio.run(Worker(index, resolve(target), inbox, outbox, interval).run())
+
+class Worker:
+
+    def __init__(self, index, target, inbox, outbox, interval):
+        self.index = index
+        self.target = target
+        self.inbox = inbox
+        self.outbox = outbox
+        self.interval = interval
+        self.sessions = {}     # session id -> task
+        self.draining = False
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self.receive, args=(loop,), daemon=True).start()
+        while not (self.draining and not self.sessions):
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.outbox.put(("status", self.index, len(self.sessions), lag))
+
+    def receive(self, loop):
+        while True:
+            message = self.inbox.get()
+            loop.call_soon_threadsafe(self.handle, message)
+
+    def handle(self, message):
+        match message:
+            case ("start", id, payload):
+                task = asyncio.create_task(self.target(payload))
+                task.add_done_callback(lambda task: self.finished(id, task))
+                self.sessions[id] = task
+            case ("drain",):
+                self.draining = True
+            case ("resume",):
+                self.draining = False
+            case ("stop",):
+                self.draining = True
+                for task in self.sessions.values():
+                    task.cancel()
+
+    def finished(self, id, task):
+        self.sessions.pop(id, None)
+        error = None
+        if task.cancelled():
+            error = "cancelled"
+        elif task.exception() is not None:
+            error = repr(task.exception())
+        self.outbox.put(("ended", self.index, id, error))
+
+#------------------------------------------------------------------------------
+# the front end
+#------------------------------------------------------------------------------
+
+async def serve(supervisor, host = "127.0.0.1", port = 7861):
+
+    def reply(status, data):
+        return status, "application/json", json.dumps(data).encode("utf-8")
+
+    def start(body):
+        assigned = supervisor.assign(json.loads(body or b"{}"))
+        if assigned is None:
+            return reply("503 Service Unavailable", {"error": "every worker is full"})
+        return reply("200 OK", {"session": assigned[0], "worker": assigned[1]})
+
+    def status(body):
+        return reply("200 OK", {"workers": supervisor.status(), "restarts": supervisor.restarts})
+
+    return await listen({
+        ("POST", "/start"):  start,
+        ("GET",  "/status"): status,
+    }, host, port)
+
+#------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m experience.supervisor")
+    parser.add_argument("target", help="module:function, an async function(payload) that runs one session")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--cap", type=int, default=Supervisor.CAP)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7861)
+    args = parser.parse_args()
+
+    supervisor = Supervisor(args.target, args.workers, args.cap).start()
+
+    async def run():
+        stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stopping.set)
+        server = await serve(supervisor, args.host, args.port)
+        print(f"{supervisor.count} workers, up to {args.cap} sessions each, on http://{args.host}:{args.port}")
+        async with server:
+            await stopping.wait()
+
+    try:
+        asyncio.run(run())
+    finally:
+        supervisor.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import pytest
+import threading
+from .audio import Audio, AudioCache
+
+#------------------------------------------------------------------------------
+
+def test_audio_cache(tmp_path):
+
+    cache = AudioCache(tmp_path / "audio", capacity=10)
+
+    hello   = AudioCache.key("Hello.", "rachel", "flash")
+    goodbye = AudioCache.key("Goodbye.", "rachel", "flash")
+    assert AudioCache.key("Hello.", "clyde", "flash") != hello
+    assert AudioCache.key("Hello.", "rachel", "turbo") != hello
+
+    assert cache.get(hello) is None
+    assert cache.contains(hello) == False
+
+    cache.put(hello, Audio(b"\x01\x02" * 3, 24000, 1))
+    assert cache.contains(hello)
+    assert cache.get(hello) == Audio(b"\x01\x02" * 3, 24000, 1)
+    assert cache.size == 6
+
+    cache.put(goodbye, Audio(b"\x03" * 8, 16000, 2))
+    assert list(cache.memory) == [goodbye]
+    assert cache.size == 8
+
+    assert cache.get(hello) == Audio(b"\x01\x02" * 3, 24000, 1)
+    assert list(cache.memory) == [hello]
+
+    reopened = AudioCache(tmp_path / "audio")
+    assert reopened.get(goodbye) == Audio(b"\x03" * 8, 16000, 2)
+
+#------------------------------------------------------------------------------
+
+def test_audio_cache_is_shared_between_threads(tmp_path):
+
+    cache = AudioCache(tmp_path / "audio", capacity=64)
+    keys  = [AudioCache.key(f"Line {i}.", "rachel", "flash") for i in range(8)]
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(200):
+                key = keys[(n + i) % len(keys)]
+                cache.put(key, Audio(bytes(16), 24000, 1))    # everyone writes the same few lines
+                cache.get(key)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.size == sum(len(audio.pcm) for audio in cache.memory.values()) <= 64
+    assert sorted(os.listdir(tmp_path / "audio")) == sorted(key + AudioCache.EXTENSION for key in keys)
+
+#------------------------------------------------------------------------------
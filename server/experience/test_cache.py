@@ -0,0 +1,46 @@
+import pytest
+from .cache import ResponseCache, normalize
+from .metrics import Counter
+
+#------------------------------------------------------------------------------
+
+def test_normalize():
+
+    assert normalize("Um, look around... please!")   == "look around"
+    assert normalize("What's in the DRAWER?")        == "what's in the drawer"
+    assert normalize("  uh  ")                       == ""
+    assert ResponseCache.key("abc", "Look around!") == ("abc", "look around")
+    assert ResponseCache.key("abc", "um")           is None
+
+#------------------------------------------------------------------------------
+
+def test_cache_expires_and_evicts():
+
+    now = [0.0]
+    counter = Counter("pcc_test_total", "test", "result")
+    cache = ResponseCache(capacity=2, ttl=10, counter=counter, clock=lambda: now[0])
+
+    look   = ResponseCache.key("room", "look around")
+    drawer = ResponseCache.key("room", "what's in the drawer")
+    desk   = ResponseCache.key("room", "what's on the desk")
+
+    assert cache.get(look) is None
+    cache.put(look, "A dusty study.")
+    assert cache.get(ResponseCache.key("room", "Um, look around.")) == "A dusty study."
+    assert cache.get(ResponseCache.key("changed", "look around")) is None
+
+    cache.put(drawer, "A closed drawer.")
+    cache.get(look)
+    cache.put(desk, "A plain desk.")
+    assert len(cache) == 2
+    assert cache.get(drawer) is None
+    assert cache.get(look) == "A dusty study."
+
+    now[0] = 10.0
+    assert cache.get(look) is None
+    assert len(cache) == 1
+
+    assert counter.value("hit")  == 3
+    assert counter.value("miss") == 4
+
+#------------------------------------------------------------------------------
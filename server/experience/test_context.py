@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from .context import ContextBudget, recap
+
+#------------------------------------------------------------------------------
+
+def words(text):
+    return len(text.split())
+
+def conversation(turns):
+    messages = [
+        {"role": "system", "content": "you are the narrator"},
+        {"role": "system", "content": "the world is old"},
+    ]
+    for i in range(turns):
+        messages.append({"role": "user",      "content": f"question {i}"})
+        messages.append({"role": "system",    "content": f"the world changed {i}"})
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+    return messages
+
+#------------------------------------------------------------------------------
+
+def test_context_within_budget():
+
+    budget = ContextBudget(lambda max_tokens: "the world now", budget=100, count=words)
+    messages = conversation(5)
+    assert budget.size(messages) == 4 + 4 + 5 * (2 + 4 + 2)
+    assert budget.fit(messages) is None
+    assert budget.trimmed == 0
+
+#------------------------------------------------------------------------------
+
+def test_context_trims_old_turns_and_keeps_the_world():
+
+    budget = ContextBudget(lambda max_tokens: "the world now", budget=30, keep=4, count=words)
+    fitted = budget.fit(conversation(6))
+
+    assert fitted[0]["content"] == "you are the narrator"                  # always kept
+    assert fitted[1]["content"] == "the world now"                         # replaces every world message
+    assert fitted[2] is budget.message                                     # stands in for the trimmed turns
+    assert [m["content"] for m in fitted[3:]] == ["question 4", "answer 4", "question 5", "answer 5"]
+    assert budget.size(fitted) <= 30
+    assert budget.trimmed == 8
+    assert [m["content"] for m in budget.backlog] == [f"{kind} {i}" for i in range(4) for kind in ("question", "answer")]
+
+    assert budget.fit(fitted) is None
+
+def test_context_never_trims_the_most_recent_turns():
+
+    budget = ContextBudget(lambda max_tokens: "the world now " * 20, budget=20, keep=4, count=words)
+    fitted = budget.fit(conversation(2))
+    assert [m["content"] for m in fitted[2:]] == ["question 0", "answer 0", "question 1", "answer 1"]
+    assert budget.trimmed == 0
+    assert budget.message not in fitted
+
+#------------------------------------------------------------------------------
+
+def test_context_summarizes_in_the_background():
+
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def summarize(summary, turns, limit):
+        started.set()
+        await release.wait()
+        return summary + "".join(f"[{turn['content']}]" for turn in turns)
+
+    budget = ContextBudget(lambda max_tokens: "the world now", budget=30, keep=4, count=words, summarize=summarize)
+
+    async def main():
+        fitted = budget.fit(conversation(6))
+        task = budget.summarizing()
+        await started.wait()
+        assert budget.message["content"] == ContextBudget.PLACEHOLDER     # the turn goes ahead without it
+        release.set()
+        await task
+        assert fitted[2]["content"] == "Earlier in the conversation:\n[question 0][answer 0][question 1][answer 1][question 2][answer 2][question 3][answer 3]"
+        assert budget.backlog == []
+        assert budget.summarizing() is task                                # nothing left to summarize
+
+    asyncio.run(main())
+
+def test_context_drops_turns_when_summarizing_fails():
+
+    async def summarize(summary, turns, limit):
+        raise RuntimeError("no summary today")
+
+    budget = ContextBudget(lambda max_tokens: "the world now", budget=30, keep=4, count=words, summarize=summarize)
+
+    async def main():
+        fitted = budget.fit(conversation(6))
+        await budget.summarizing()
+        assert fitted[2]["content"] == ContextBudget.PLACEHOLDER
+        assert budget.errors == 1
+        assert budget.backlog == []
+
+    asyncio.run(main())
+
+#------------------------------------------------------------------------------
+
+def test_recap():
+
+    turns = [
+        {"role": "user",      "content": "open the drawer"},
+        {"role": "assistant", "content": "it creaks open"},
+    ]
+    assert asyncio.run(recap("", turns, limit=100, count=words)) == "- The player said: open the drawer\n- You said: it creaks open"
+    assert asyncio.run(recap("- The player said: hello", turns, limit=10, count=words)) == "- You said: it creaks open"
+
+#------------------------------------------------------------------------------
+
+def test_context_gives_the_world_a_share_of_the_budget():
+
+    def world(max_tokens):
+        return " ".join(["fact"] * min(5000, max_tokens))      # a huge world, streamed up to the limit
+
+    budget = ContextBudget(world, budget=1500, keep=4)
+    messages = [
+        {"role": "system", "content": "you are the narrator"},
+        {"role": "system", "content": world(5000)},
+    ]
+    for i in range(10):
+        messages.append({"role": "user",      "content": f"question {i}"})
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+
+    fitted = budget.fit(messages)
+    assert budget.cost(fitted[1]) == budget.share() == 600
+    assert budget.size(fitted) <= 1500
+    assert budget.trimmed == 0                                 # no history was lost to the world
+    assert budget.fit(fitted) is None
+
+#------------------------------------------------------------------------------
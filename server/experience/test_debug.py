@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from .debug import DebugChannel
+
+Level = DebugChannel.Level
+
+#------------------------------------------------------------------------------
+
+def test_debug_channel_batches_records():
+
+    sent = []
+    async def send(records, dropped):
+        sent.append((records, dropped))
+
+    async def main():
+        channel = DebugChannel(send, batch=3, interval=0.01)
+        channel.start()
+        for n in range(7):
+            channel.post(Level.EVENTS, n)
+        channel.post(Level.FRAMES, "ignored")
+        await asyncio.sleep(0.05)
+        await channel.stop()
+        return channel
+
+    channel = asyncio.run(main())
+    assert sent == [([0, 1, 2], 0), ([3, 4, 5], 0), ([6], 0)]
+    assert channel.sent == 3
+
+#------------------------------------------------------------------------------
+
+def test_debug_channel_drops_the_oldest_records():
+
+    sent = []
+    async def send(records, dropped):
+        sent.append((records, dropped))
+
+    channel = DebugChannel(send, level=Level.FRAMES, capacity=4, batch=10)
+    for n in range(10):
+        channel.post(Level.FRAMES, n)
+    assert list(channel.records) == [6, 7, 8, 9]
+    assert channel.dropped == 6
+
+    asyncio.run(channel.flush())
+    assert sent == [([6, 7, 8, 9], 6)]
+    assert channel.dropped == 0
+
+    channel.level = Level.OFF
+    channel.post(Level.EVENTS, "ignored")
+    assert len(channel.records) == 0
+    assert channel.wants(Level.EVENTS) == False
+    assert DebugChannel.Level.parse("frames") == Level.FRAMES
+
+#------------------------------------------------------------------------------
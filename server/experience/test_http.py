@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from .http import HTTPPool
+from .metrics import Registry
+
+#------------------------------------------------------------------------------
+
+def test_http_pool_reuses_connections():
+
+    async def hello(request):
+        return web.Response(text="hello")
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/", hello)
+        registry = Registry()
+        pool = HTTPPool(registry=registry)
+        async with TestServer(app) as server:
+            url = server.make_url("/")
+            for _ in range(5):
+                async with pool.session().get(url) as response:
+                    assert await response.text() == "hello"
+            session = pool.session()
+            await pool.close()
+            assert session.closed
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool.connections.value("created") == 1
+    assert pool.connections.value("reused")  == 4
+    assert pool.connecting.count("127.0.0.1") == 1
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,37 @@
+import pytest
+from .imports import parse, profile, total, packages
+
+#------------------------------------------------------------------------------
+
+OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     encodings.aliases
+import time:       300 |        400 |   encodings
+import time:        50 |         50 |     engine.command
+import time:       150 |        600 |   engine
+import time:        20 |       1020 | bot
+something else on stderr
+"""
+
+def test_parse():
+
+    imports = parse(OUTPUT)
+    assert imports == [
+        ("encodings.aliases", 2, 100, 100),
+        ("encodings",         1, 300, 400),
+        ("engine.command",    2, 50,  50),
+        ("engine",            1, 150, 600),
+        ("bot",               0, 20,  1020),
+    ]
+    assert total(imports, "bot")     == 1020
+    assert total(imports, "missing") is None
+    assert packages(imports) == [("encodings", 400), ("engine", 200), ("bot", 20)]
+
+#------------------------------------------------------------------------------
+
+def test_profile():
+
+    imports = profile("engine.room")
+    assert total(imports, "engine.room") > 0
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,40 @@
+import pytest
+from .intents import Intents
+
+#------------------------------------------------------------------------------
+
+def test_intents_match_whole_words():
+
+    intents = Intents()
+    intents.register("man",   ["man"],   "MAN")
+    intents.register("woman", ["woman"], "WOMAN")
+
+    assert intents.match("switch to the man")         == ["man"]
+    assert intents.match("switch to the woman")       == ["woman"]
+    assert intents.match("Woman! no, the MAN please") == ["woman", "man"]
+    assert intents.match("manage that command")       == []
+    assert intents.match("the woman's voice")         == ["woman"]
+    assert intents.actions("the man")                 == [("man", "MAN")]
+
+    intents.register("woman", ["woman's voice"], "WOMAN")
+    assert intents.match("use the woman's voice")     == ["woman"]
+    assert intents.match("use the woman voice")       == []
+
+#------------------------------------------------------------------------------
+
+def test_intents_prefer_the_longest_phrase():
+
+    intents = Intents()
+    intents.register("debug",     ["debug"],     "DEBUG")
+    intents.register("debug-on",  ["debug on"],  "ON")
+    intents.register("debug-off", ["debug off", "stop debugging"], "OFF")
+
+    assert intents.match("debug")                 == ["debug"]
+    assert intents.match("turn debug on")         == ["debug-on"]
+    assert intents.match("please stop debugging") == ["debug-off"]
+
+    intents.register("debug-on", ["start debugging"], "ON")
+    assert intents.match("turn debug on")         == ["debug"]
+    assert intents.match("start debugging")       == ["debug-on"]
+
+#------------------------------------------------------------------------------
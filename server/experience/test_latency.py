@@ -0,0 +1,61 @@
+import pytest
+from .latency import TurnLatency
+from .metrics import Histogram
+
+#------------------------------------------------------------------------------
+
+def test_turn_latency_per_stage():
+
+    histogram = Histogram("pcc_test_seconds", "test", "stage")
+    latency = TurnLatency(histogram)
+
+    latency.mark("llm-started",  0.5, id=1)    # before any turn, ignored
+    latency.mark("user-stopped", 1.0, id=2)
+    latency.mark("user-stopped", 1.1, id=2)    # the same frame at the next hop, ignored
+    latency.mark("transcribed",  1.25, id=3)
+    latency.mark("transcribed",  1.5, id=3)
+    latency.mark("llm-started",  2.0, id=4)
+    latency.mark("tts-started",  2.5, id=5)
+    latency.mark("bot-started",  3.0, id=6)
+    latency.mark("bot-started",  3.1, id=6)
+
+    assert histogram.series["transcribed"][1] == 0.25
+    assert histogram.series["llm-started"][1] == 0.75
+    assert histogram.series["tts-started"][1] == 0.5
+    assert histogram.series["bot-started"][1] == 0.5
+    assert histogram.series["turn"][1]        == 2.0
+    assert histogram.count("turn")            == 1
+
+#------------------------------------------------------------------------------
+
+def test_transcription_before_the_user_stopped():
+
+    histogram = Histogram("pcc_test_seconds", "test", "stage")
+    latency = TurnLatency(histogram)
+
+    latency.mark("transcribed",  9.0,  id=1)   # turn detection is still waiting for silence
+    latency.mark("transcribed",  9.1,  id=1)
+    latency.mark("user-stopped", 10.0, id=2)
+    latency.mark("transcribed",  10.1, id=1)   # a late hop of the same transcription
+    latency.mark("user-stopped", 10.2, id=2)
+    latency.mark("llm-started",  11.0, id=3)
+    latency.mark("llm-started",  11.1, id=3)
+    latency.mark("bot-started",  12.5, id=4)   # no tts stage seen, measured from the llm
+
+    assert histogram.count("transcribed")     == 1
+    assert histogram.series["transcribed"][1] == 0.0
+    assert histogram.series["llm-started"][1] == 1.0
+    assert histogram.count("tts-started")     == 0
+    assert histogram.series["bot-started"][1] == 1.5
+    assert histogram.series["turn"][1]        == 2.5
+
+    latency.mark("user-stopped", 20.0, id=5)   # a new turn, interrupting nothing
+    latency.mark("user-stopped", 21.0, id=6)   # the user spoke again, starts over
+    latency.mark("transcribed",  21.5, id=7)
+    latency.mark("bot-started",  22.0, id=8)
+
+    assert histogram.series["transcribed"][1] == 0.5
+    assert histogram.count("turn")            == 2
+    assert histogram.series["turn"][1]        == 3.5
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from .metrics import Registry, serve
+
+#------------------------------------------------------------------------------
+
+def test_histograms_render_as_prometheus_text():
+
+    registry = Registry()
+    histogram = registry.histogram("pcc_test_seconds", "a test histogram", "stage", buckets=(0.1, 1.0))
+    histogram.observe("llm", 0.05)
+    histogram.observe("llm", 0.5)
+    histogram.observe("llm", 5.0)
+    histogram.observe('say "hi"', 0.1)
+
+    assert histogram.count("llm") == 3
+    assert histogram.count("tts") == 0
+    assert registry.render().splitlines() == [
+        '# HELP pcc_test_seconds a test histogram',
+        '# TYPE pcc_test_seconds histogram',
+        'pcc_test_seconds_bucket{stage="llm",le="0.1"} 1',
+        'pcc_test_seconds_bucket{stage="llm",le="1.0"} 2',
+        'pcc_test_seconds_bucket{stage="llm",le="+Inf"} 3',
+        'pcc_test_seconds_sum{stage="llm"} 5.55',
+        'pcc_test_seconds_count{stage="llm"} 3',
+        'pcc_test_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1',
+        'pcc_test_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 1',
+        'pcc_test_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 1',
+        'pcc_test_seconds_sum{stage="say \\"hi\\""} 0.1',
+        'pcc_test_seconds_count{stage="say \\"hi\\""} 1',
+    ]
+
+    with pytest.raises(AssertionError):
+        registry.histogram("pcc_test_seconds", "again", "stage")
+
+#------------------------------------------------------------------------------
+
+def test_metrics_are_served_over_http():
+
+    registry = Registry()
+    registry.histogram("pcc_test_seconds", "a test histogram", "stage").observe("llm", 0.2)
+
+    async def get(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    async def main():
+        server = await serve(registry, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await get(port, "/metrics"), await get(port, "/other")
+
+    metrics, other = asyncio.run(main())
+    assert metrics.startswith("HTTP/1.0 200 OK")
+    assert 'pcc_test_seconds_count{stage="llm"} 1' in metrics
+    assert other.startswith("HTTP/1.0 404")
+
+#------------------------------------------------------------------------------
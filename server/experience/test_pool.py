@@ -0,0 +1,34 @@
+import asyncio
+import itertools
+import pytest
+from .pool import WarmPool
+
+#------------------------------------------------------------------------------
+
+def test_warm_pool():
+
+    counter = itertools.count()
+    pool = WarmPool(lambda: next(counter), size=2)
+
+    async def main():
+        first = await pool.acquire()                  # cold, built on demand
+        await pool.fill()
+        assert list(pool.ready) == [1, 2]
+
+        second = await pool.acquire()                 # warm
+        third  = await pool.acquire()                 # warm
+        await pool.fill()
+        assert list(pool.ready) == [3, 4]
+
+        await pool.close()
+        assert len(pool) == 0
+        return [first, second, third]
+
+    assert asyncio.run(main()) == [0, 1, 2]
+    assert pool.hits   == 2
+    assert pool.misses == 1
+
+    pool.prefill()
+    assert list(pool.ready) == [5, 6]
+
+#------------------------------------------------------------------------------
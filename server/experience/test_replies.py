@@ -0,0 +1,28 @@
+import pytest
+from .replies import describe_events, lines
+from engine.event import Event
+from engine.template import Template
+
+#------------------------------------------------------------------------------
+
+def test_describe_events():
+
+    assert describe_events(Event.Opened(target="drawer")) == "You open the drawer."
+    assert describe_events([
+        Event.Opened(target="drawer"),
+        Event.Taken(target="key"),
+    ]) == "You open the drawer. You take the key."
+
+#------------------------------------------------------------------------------
+
+def test_lines():
+
+    assert sorted(lines(Template.load("data/room1.json"))) == [
+        "You close the door.",
+        "You close the drawer.",
+        "You open the door.",
+        "You open the drawer.",
+        "You take the key.",
+    ]
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,16 @@
+import pytest
+from .standin import StandinLLM
+
+#------------------------------------------------------------------------------
+
+def test_standin_llm():
+
+    llm = StandinLLM(delay=0)
+    assert llm.reply([]) == "Hello, I am a stand-in narrator."
+    assert llm.reply([
+        {"role": "system", "content": "The [desk] has a [drawer]"},
+        {"role": "user",   "content": "look around"},
+    ]) == "You said 'look around'. Around you are: desk, drawer."
+    assert llm.calls == 2
+
+#------------------------------------------------------------------------------
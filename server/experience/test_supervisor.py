@@ -0,0 +1,187 @@
+import asyncio
+import queue
+import time
+from .supervisor import Supervisor, WorkerState, least_loaded, serve
+
+#------------------------------------------------------------------------------
+# session targets, run in the worker processes
+#------------------------------------------------------------------------------
+
+async def session(payload):
+    if payload.get("hang"):
+        time.sleep(payload["seconds"])    # blocks the worker's event loop
+    else:
+        time.sleep(payload.get("stall", 0))
+        await asyncio.sleep(payload["seconds"])
+
+def wait(condition, timeout = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+#------------------------------------------------------------------------------
+
+def test_least_loaded():
+
+    a, b, c = WorkerState(0), WorkerState(1), WorkerState(2)
+    a.sessions = {1, 2}
+    b.sessions = {3}
+    c.sessions = {4}
+    c.lag = 0.005
+
+    assert least_loaded([a, b, c], cap=3, lag_per_session=0.01) is b    # fewest sessions, least lag
+
+    c.lag = 0.0
+    assert least_loaded([a, b, c], cap=3, lag_per_session=0.01) is b    # ties go to the lowest index
+
+    b.lag = 0.02
+    assert least_loaded([a, b, c], cap=3, lag_per_session=0.01) is c    # lag counts as load
+
+    c.draining = time.monotonic()
+    b.sessions = {3, 5, 6}
+    assert least_loaded([a, b, c], cap=3, lag_per_session=0.01) is a    # b is full, c is draining
+
+    a.sessions = {1, 2, 7}
+    assert least_loaded([a, b, c], cap=3, lag_per_session=0.01) is None
+
+#------------------------------------------------------------------------------
+
+def test_supervisor():
+
+    supervisor = Supervisor("experience.test_supervisor:session", workers=2, cap=2, interval=0.05).start()
+    try:
+        assigned = [supervisor.assign({"seconds": 0.2}) for _ in range(5)]
+        assert [worker for _, worker in assigned[:4]] == [0, 1, 0, 1]
+        assert assigned[4] is None    # both workers are at their cap
+
+        wait(lambda: len(supervisor.ended) == 4)
+        assert all(error is None for error in supervisor.ended.values())
+        assert supervisor.assign({"seconds": 0}) is not None
+    finally:
+        supervisor.stop()
+
+#------------------------------------------------------------------------------
+
+def test_supervisor_restarts_a_stuck_worker():
+
+    supervisor = Supervisor("experience.test_supervisor:session", workers=2, cap=4, interval=0.05,
+                            stuck_lag=0.5, stuck_after=0.5, drain_timeout=0.5).start()
+    try:
+        wait(lambda: all(w.seen is not None for w in supervisor.workers))
+        stuck, worker = supervisor.assign({"seconds": 60, "hang": True})
+        pid = supervisor.workers[worker].process.pid
+        other, _ = supervisor.assign({"seconds": 1.0})
+
+        wait(lambda: supervisor.restarts == 1)
+        assert supervisor.ended[stuck] == "worker restarted"
+        assert supervisor.workers[worker].process.pid != pid
+
+        wait(lambda: other in supervisor.ended)
+        assert supervisor.ended[other] is None    # the other worker's session was untouched
+        assert supervisor.restarts == 1
+    finally:
+        supervisor.stop()
+
+#------------------------------------------------------------------------------
+
+class Process:
+    pid = 0
+    def is_alive(self):
+        return True
+
+def test_lagging_workers_are_drained_and_recover():
+
+    supervisor = Supervisor("unused", workers=1, stuck_lag=1.0, stuck_after=5.0, drain_timeout=30.0)
+    worker = WorkerState(0, Process(), queue.Queue())
+    worker.seen = worker.started
+    supervisor.workers = [worker]
+    start = worker.started
+
+    supervisor.receive(("status", 0, 3, 2.0))              # a one-off stall
+    supervisor.check(start + 1.0)
+    supervisor.receive(("status", 0, 3, 0.01))
+    supervisor.check(start + 4.0)
+    assert worker.draining is None and worker.lagging is None
+
+    supervisor.receive(("status", 0, 3, 2.0))              # lagging, and still lagging 6s later
+    lagging = worker.lagging
+    supervisor.check(lagging + 4.0)
+    assert worker.draining is None
+    supervisor.check(lagging + 6.0)
+    assert worker.draining == lagging + 6.0
+    assert worker.inbox.get_nowait() == ("drain",)
+    assert supervisor.assign({}) is None                   # no new sessions while draining
+
+    supervisor.receive(("status", 0, 3, 0.01))             # recovered
+    assert worker.draining is None
+    assert worker.inbox.get_nowait() == ("resume",)
+    assert supervisor.restarts == 0
+
+#------------------------------------------------------------------------------
+
+def test_supervisor_keeps_a_worker_that_stalls_once():
+
+    supervisor = Supervisor("experience.test_supervisor:session", workers=1, cap=4, interval=0.05,
+                            stuck_lag=0.2, stuck_after=0.5, drain_timeout=1.0).start()
+    try:
+        wait(lambda: all(w.seen is not None for w in supervisor.workers))
+        pid = supervisor.workers[0].process.pid
+        stalled, _ = supervisor.assign({"seconds": 0.5, "stall": 0.4})
+        drained = False
+        deadline = time.monotonic() + 1.5
+        while time.monotonic() < deadline:
+            drained = drained or supervisor.workers[0].draining is not None
+            time.sleep(0.01)
+
+        assert not drained
+        assert supervisor.ended[stalled] is None
+        assert supervisor.workers[0].process.pid == pid
+        assert supervisor.restarts == 0
+    finally:
+        supervisor.stop()
+
+#------------------------------------------------------------------------------
+
+def test_ended_sessions_are_pruned(monkeypatch):
+
+    monkeypatch.setattr(Supervisor, "ENDED", 3)
+    supervisor = Supervisor("unused", workers=1)
+    supervisor.workers = [WorkerState(0, Process(), queue.Queue())]
+    for id in range(5):
+        supervisor.receive(("ended", 0, id, None))
+    assert list(supervisor.ended) == [2, 3, 4]
+
+#------------------------------------------------------------------------------
+
+def test_front_end():
+
+    supervisor = Supervisor("unused", workers=1, cap=1)
+    supervisor.workers = [WorkerState(0, Process(), queue.Queue())]
+
+    async def request(port, method, path, body = b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    async def main():
+        server = await serve(supervisor, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return [
+                await request(port, "POST", "/start", b'{"room": "study"}'),
+                await request(port, "POST", "/start"),
+                await request(port, "GET", "/status"),
+                await request(port, "GET", "/other"),
+            ]
+
+    started, full, status, other = asyncio.run(main())
+    assert started.startswith("HTTP/1.0 200 OK") and started.endswith('{"session": 1, "worker": 0}')
+    assert full.startswith("HTTP/1.0 503")
+    assert '"sessions": 1' in status
+    assert other.startswith("HTTP/1.0 404")
+    assert supervisor.workers[0].inbox.get_nowait() == ("start", 1, {"room": "study"})
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,58 @@
+import pytest
+from .tracing import Tracer
+
+#------------------------------------------------------------------------------
+
+class Frame:
+    pass
+
+class AudioFrame(Frame):
+    pass
+
+class TextFrame(Frame):
+    def __init__(self, text):
+        self.text = text
+
+class LLMTextFrame(TextFrame):
+    pass
+
+#------------------------------------------------------------------------------
+
+def test_tracer_dispatches_by_class():
+
+    formatted = []
+    def details(frame):
+        formatted.append(frame)
+        return frame.text
+
+    tracer = Tracer(
+        details=[(TextFrame, details)],
+        every={AudioFrame: 0},
+    )
+
+    assert tracer.sample(AudioFrame()) is None
+
+    trace = tracer.sample(Frame())
+    assert trace is not None
+    assert trace.format(Frame()) is None
+
+    frame = LLMTextFrame("hello")
+    trace = tracer.sample(frame)
+    assert formatted == []
+    assert trace.format(frame) == "hello"
+    assert formatted == [frame]
+
+    assert set(tracer._cache) == {AudioFrame, Frame, LLMTextFrame}
+    assert tracer._cache[AudioFrame] is None
+
+#------------------------------------------------------------------------------
+
+def test_tracer_samples_by_class():
+
+    tracer = Tracer(every={TextFrame: 3})
+
+    traced = [tracer.sample(LLMTextFrame("x")) is not None for _ in range(7)]
+    assert traced == [False, False, True, False, False, True, False]
+    assert all(tracer.sample(Frame()) is not None for _ in range(3))
+
+#------------------------------------------------------------------------------
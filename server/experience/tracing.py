@@ -0,0 +1,52 @@
+#------------------------------------------------------------------------------
+# A Tracer decides which pipeline frames are worth tracing. The decision is
+# resolved once per frame class, from an ordered table of detail formatters
+# (first matching class wins, like an isinstance chain) and a table of
+# sampling rates (trace 1 in every N frames of that class, 0 for never), and
+# cached, so the high rate audio frames cost one dict lookup. Details are only
+# formatted for the frames that are actually traced.
+#------------------------------------------------------------------------------
+
+class Trace:
+    __slots__ = ("details", "every", "count")
+
+    def __init__(self, details, every):
+        self.details = details    # frame -> details, or None
+        self.every = every
+        self.count = 0
+
+    def format(self, frame):
+        if self.details is None:
+            return None
+        return self.details(frame)
+
+class Tracer:
+
+    def __init__(self, details = None, every = None):
+        self.details = details or []   # [(frame class, frame -> details)]
+        self.every = every or {}       # frame class -> N, trace 1 in every N
+        self._cache = {}               # frame class -> Trace, or None if never traced
+
+    def sample(self, frame):
+        # the Trace for [frame] if it should be traced, otherwise None
+        cls = type(frame)
+        try:
+            trace = self._cache[cls]
+        except KeyError:
+            trace = self._cache[cls] = self.resolve(cls)
+        if trace is None:
+            return None
+        trace.count += 1
+        if trace.count < trace.every:
+            return None
+        trace.count = 0
+        return trace
+
+    def resolve(self, cls):
+        every = next((self.every[base] for base in cls.__mro__ if base in self.every), 1)
+        if every <= 0:
+            return None
+        details = next((details for base, details in self.details if issubclass(cls, base)), None)
+        return Trace(details, every)
+
+#------------------------------------------------------------------------------
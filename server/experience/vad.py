@@ -0,0 +1,24 @@
+import copy
+
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer
+
+#------------------------------------------------------------------------------
+# a SileroVADAnalyzer that shares one onnx session (the model) with every
+# other analyzer in the process, only the recurrent state is per session.
+# Importing this module loads onnxruntime, so only do so when building one.
+#------------------------------------------------------------------------------
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+
+    MODEL = None
+
+    def __init__(self, *, sample_rate = None, params = None):
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        if SharedSileroVADAnalyzer.MODEL is None:
+            SharedSileroVADAnalyzer.MODEL = SileroVADAnalyzer()._model
+        self._model = copy.copy(SharedSileroVADAnalyzer.MODEL)
+        self._model.reset_states()
+        self._last_reset_time = 0
+
+#------------------------------------------------------------------------------
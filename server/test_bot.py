@@ -0,0 +1,34 @@
+import os
+import pytest
+
+pytest.importorskip("pipecat")
+
+from experience.imports import profile, total
+
+#------------------------------------------------------------------------------
+# every cold start on Pipecat Cloud pays for importing bot.py before the caller
+# hears anything, so keep it within a budget and keep the heavy dependencies
+# (transports, vendor SDKs, the VAD model) out of it
+#------------------------------------------------------------------------------
+
+BUDGET = float(os.getenv("PCC_IMPORT_BUDGET", "3.0"))   # seconds
+
+DEFERRED = [
+    "daily",
+    "onnxruntime",
+    "pipecat.transports.services.daily",
+    "pipecat.audio.vad.silero",
+    "pipecat.services.deepgram.stt",
+    "pipecat.services.elevenlabs.tts",
+    "pipecat.services.openai.llm",
+]
+
+def test_import_time_budget():
+
+    imports = profile("bot")
+    names = {name for name, _, _, _ in imports}
+
+    assert total(imports, "bot") / 1e6 < BUDGET
+    assert [module for module in DEFERRED if module in names] == []
+
+#------------------------------------------------------------------------------